@@ -1,17 +1,64 @@
 """The xi_home integration."""
 from __future__ import annotations
+from contextlib import nullcontext
 from datetime import timedelta
 import logging
+import time
+import weakref
 import async_timeout
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import update_coordinator
 from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util
+from homeassistant.util.async_ import run_callback_threadsafe
 
-from .const import DOMAIN
-from .helper import request_data
+from .aggregate import HOME_GROUP, GroupAggregates
+from .api import list_body
+from .capture import TrafficRecorder, TrafficReplayer
+from .command import AcsCommandMerger
+from .const import (
+    CONF_FORCE_WRITE_INTERVAL,
+    CONF_LOCAL_HOST,
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_POLL_TIMEOUT,
+    CONF_PUSH_URL,
+    CONF_RATE_LIMIT,
+    CONF_RETRY,
+    CONF_SCAN_INTERVAL,
+    DATA_HANDOFF,
+    DEFAULT_OPTIONS,
+    DEVICE_REMOVE_DELAY,
+    DOMAIN,
+    ENDPOINT_TIMEOUTS,
+    EVENT_DEVICE_CHANGED,
+    HANDOFF_TTL,
+    HEATING_STORE_FIELDS,
+    PUSH_POLL_INTERVAL,
+    SIGNAL_DEVICES_ADDED,
+    SIGNAL_DEVICES_REMOVED,
+    STORE_COMPACT_INTERVAL,
+    STORE_DIRECTORY,
+    TIMEOUT,
+)
+from .coordinator import POLL_GRACE, AirQualityCoordinator, MetadataCoordinator
+from .deadband import WriteFilter
+from .helper import RateLimiter, close_sessions
+from .profiler import PollProfiler
+from .push import PushListener
+from .services import (
+    async_close_recorder,
+    async_setup_services,
+    async_unload_services,
+)
+from .snapshot import freeze_data, status_changes, thaw, with_status
+from .timeseries import TimeSeriesStore
+from .transport import CloudTransport, LocalTransport
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,29 +74,92 @@ PLATFORMS: list[Platform] = [
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up xi_home from a config entry."""
-    coordinator = MyCoordinator(hass, entry.data["token"], entry.data["username"])
+    coordinator = MyCoordinator(
+        hass, entry.data["token"], entry.data["username"], options=entry.options
+    )
+    handoff = hass.data.get(DATA_HANDOFF, {}).pop(entry.data["username"], None)
+    if handoff is not None and time.monotonic() - handoff["time"] < HANDOFF_TTL:
+        coordinator.seed(
+            handoff["session_id"], handoff["devices"], handoff.get("lobby_doors")
+        )
+        if "air_quality" in handoff:
+            coordinator.air_quality.seed(**handoff["air_quality"])
+    coordinator.entry_id = entry.entry_id
+    coordinator.store = TimeSeriesStore(hass.config.path(STORE_DIRECTORY))
+    entry.async_on_unload(coordinator.async_close_store)
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            coordinator.async_compact_store,
+            timedelta(hours=STORE_COMPACT_INTERVAL),
+        )
+    )
+    await coordinator.metadata.async_config_entry_first_refresh()
+    entry.async_on_unload(
+        coordinator.metadata.async_add_listener(coordinator.async_metadata_updated)
+    )
+    coordinator.async_metadata_updated()
     await coordinator.async_config_entry_first_refresh()
+    # air quality may still be unavailable; its entities recover on a later poll
+    await coordinator.air_quality.async_refresh()
     hass.data[DOMAIN] = coordinator
+    async_register_rooms(hass, entry.entry_id, coordinator.data["groups"])
+
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    coordinator.async_start_push()
+    entry.async_on_unload(coordinator.async_stop_push)
+
+    async_setup_services(hass)
+
+    return True
+
 
+@callback
+def async_register_rooms(hass: HomeAssistant, entry_id, groups) -> None:
+    """Register a device for each room and one for the whole home."""
     device_registry = dr.async_get(hass)
-    for room in coordinator.data["groups"]:
+    for room in groups:
         device_registry.async_get_or_create(
-            config_entry_id=entry.entry_id,
+            config_entry_id=entry_id,
             identifiers={(DOMAIN, room["name"])},
             manufacturer="XiSmartHome",
             suggested_area=room["name"],
             name=room["name"],
         )
+    device_registry.async_get_or_create(
+        config_entry_id=entry_id,
+        identifiers={(DOMAIN, HOME_GROUP)},
+        manufacturer="XiSmartHome",
+        name="Home",
+    )
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-    return True
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options to the running coordinator without a reload."""
+    coordinator = hass.data[DOMAIN]
+    push_url = coordinator.options[CONF_PUSH_URL]
+    coordinator.apply_options(entry.options)
+    if coordinator.options[CONF_PUSH_URL] != push_url:
+        await coordinator.async_stop_push()
+        coordinator.async_start_push()
 
 
 class MyCoordinator(update_coordinator.DataUpdateCoordinator):
-    """My custom coordinator."""
+    """Device state coordinator, polling /device/list-redis.
+
+    Air quality readings and the near-static account metadata have their
+    own coordinators, `air_quality` and `metadata`, each with its own
+    interval and failure domain.
 
-    def __init__(self, hass: HomeAssistant, token, user_id, session_id=None) -> None:
+    `data` is an immutable snapshot (see snapshot.py). Status changes from
+    push messages and commands are swapped in on the event loop.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, token, user_id, session_id=None, options=None
+    ) -> None:
         """Initialize my coordinator."""
         super().__init__(
             hass,
@@ -60,9 +170,315 @@ class MyCoordinator(update_coordinator.DataUpdateCoordinator):
             update_interval=timedelta(minutes=1),
         )
         self.token = token
+        self.cloud = CloudTransport(token)
+        self.local: LocalTransport | None = None
+        self.local_host = ""
+        self.local_requests = 0
+        self.local_fallbacks = 0
         self.user_id = user_id
         self.session_id = session_id
+        self.entry_id = None
+        self.options = dict(DEFAULT_OPTIONS)
+        self.rate_limiter = RateLimiter(0)
+        # write filter -> its deadband option; filters go with their entity
+        self.write_filters: weakref.WeakKeyDictionary[
+            WriteFilter, str
+        ] = weakref.WeakKeyDictionary()
+        self.push: PushListener | None = None
         self.lobby_door_data = None
+        self.profiler: PollProfiler | None = None
+        self.recorder: TrafficRecorder | None = None
+        self.replayer: TrafficReplayer | None = None
+        self.store: TimeSeriesStore | None = None
+        self._seed_data = None
+        self.push_connected = False
+        self.acs_mergers: dict[int, AcsCommandMerger] = {}
+        self.aggregates = GroupAggregates()
+        self.changed_idx: set[int] = set()
+        self.changed_groups: set[str] = set()
+        self.device_changes: list[dict] = []
+        # devices found or gone in the last poll, applied after its fan-out
+        self.added_devices: list = []
+        self.removed_idx: set[int] = set()
+        self.expired_idx: set[int] = set()
+        # devices out of list-redis: (time.monotonic() they left, entity ids)
+        self.missing: dict[int, tuple[float, list[str]]] = {}
+        # entities of each device, to remove them with the device
+        self.entities: dict[int, list] = {}
+        self.metadata = MetadataCoordinator(hass, self)
+        self.air_quality = AirQualityCoordinator(hass, self)
+        self._live_update_interval = self.update_interval
+        self.apply_options(options or {})
+
+    def apply_options(self, options):
+        """Apply options to the running coordinator, its requests and filters."""
+        self.options = {**DEFAULT_OPTIONS, **options}
+        self._live_update_interval = timedelta(seconds=self.options[CONF_SCAN_INTERVAL])
+        self.set_update_interval()
+        self.rate_limiter.rate = self.options[CONF_RATE_LIMIT]
+        self.air_quality.apply_options(self.options)
+        self.set_local_host(self.options[CONF_LOCAL_HOST])
+        for write_filter, deadband_option in self.write_filters.items():
+            write_filter.deadband = self.options[deadband_option]
+            write_filter.min_interval = self.options[CONF_MIN_WRITE_INTERVAL]
+            write_filter.force_interval = self.options[CONF_FORCE_WRITE_INTERVAL]
+
+    def set_local_host(self, host):
+        """Send device requests to the wallpad at `host`, or only to the cloud."""
+        if host == self.local_host:
+            return
+        local = self.local
+        self.local_host = host
+        self.local = LocalTransport(host) if host else None
+        if local is not None:
+            self.hass.async_add_executor_job(local.close)
+
+    def close_transports(self):
+        """Close the connections of the cloud and wallpad transports.
+
+        The HTTP sessions of the cloud transport are shared and closed
+        separately with close_sessions().
+        """
+        self.cloud.close()
+        if self.local is not None:
+            self.local.close()
+
+    def seed(self, session_id, devices, lobby_doors=None):
+        """Use a session and device list fetched by the config flow.
+
+        The first metadata refresh keeps the session id and lobby doors and
+        the first poll indexes the device list instead of requesting them
+        again.
+        """
+        self.session_id = session_id
+        self.lobby_door_data = lobby_doors
+        self._seed_data = devices
+
+    def warm_state(self):
+        """Return the state a reload of the entry seeds itself with."""
+        return {
+            "session_id": self.session_id,
+            "devices": {
+                key: value
+                for key, value in thaw(self.data).items()
+                if key != "indexed_devices"
+            },
+            "lobby_doors": self.lobby_door_data,
+            "air_quality": {
+                "devices": self.air_quality.data["devices"]
+                if self.air_quality.data
+                else {},
+                "enrich_cache": self.air_quality.enrich_cache,
+                "acs_history": self.air_quality.acs_history,
+            },
+            "time": time.monotonic(),
+        }
+
+    def track_entities(self, entities):
+        """Remember the entities of each device, to remove them with it."""
+        for entity in entities:
+            idx = getattr(entity, "idx", None)
+            if idx is not None:
+                self.entities.setdefault(idx, []).append(entity)
+
+    @callback
+    def async_start_push(self) -> None:
+        """Start the push listener if a push url is configured."""
+        if self.options[CONF_PUSH_URL]:
+            self.push = PushListener(self.hass, self, self.options[CONF_PUSH_URL])
+            self.push.async_start()
+
+    async def async_stop_push(self) -> None:
+        """Stop the push listener."""
+        push, self.push = self.push, None
+        if push is not None:
+            await push.async_stop()
+
+    def span(self, name):
+        """Time a block when a profile is running."""
+        if self.profiler is None:
+            return nullcontext()
+        return self.profiler.span(name)
+
+    def request(self, path, body, deadline=None):
+        """Send a request to the xi_home api with this account's token.
+
+        Device requests go to the wallpad when one is configured, falling
+        back to the cloud when it fails or failed recently. With a `deadline` (a
+        time.monotonic() value) the request is not retried and times out at
+        the deadline at the latest.
+        """
+        if self.replayer is not None:
+            return self.replayer.request(path, body)
+
+        start = time.monotonic()
+        timeout = self.options.get(ENDPOINT_TIMEOUTS.get(path), TIMEOUT)
+        retry = self.options[CONF_RETRY]
+        if deadline is not None:
+            timeout = max(min(timeout, deadline - start), 0.1)
+            retry = 0
+        local = self.local
+        response = None
+        if local is not None and local.handles(path) and local.available():
+            try:
+                response = local.request(
+                    path, body, profiler=self.profiler, timeout=timeout, retry=retry
+                )
+                self.local_requests += 1
+            except (OSError, ValueError) as err:
+                _LOGGER.debug("Wallpad request to %s failed: %s", path, err)
+                self.local_fallbacks += 1
+                if deadline is not None:
+                    # the cloud only gets what is left of the budget
+                    timeout = max(min(timeout, deadline - time.monotonic()), 0.1)
+        if response is None:
+            # the rate limit protects the cloud only
+            self.rate_limiter.acquire()
+            response = self.cloud.request(
+                path, body, profiler=self.profiler, timeout=timeout, retry=retry
+            )
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(path, body, response, time.monotonic() - start)
+        return response
+
+    def record_history(self, samples):
+        """Append (series, timestamp, value) readings unless replaying."""
+        if self.store is not None and self.replayer is None:
+            self.store.append(samples)
+
+    async def async_compact_store(self, _now=None) -> None:
+        """Downsample the store and apply its retention."""
+        await self.hass.async_add_executor_job(self.store.compact)
+
+    async def async_close_store(self) -> None:
+        """Flush and close the store."""
+        store, self.store = self.store, None
+        if store is not None:
+            await self.hass.async_add_executor_job(store.close)
+
+    def acs_merger(self, device_data):
+        """Return the command merger shared by both halves of an acs device."""
+        idx = device_data["idx"]
+        if idx not in self.acs_mergers:
+            self.acs_mergers[idx] = AcsCommandMerger(self, device_data)
+        return self.acs_mergers[idx]
+
+    def start_replay(self, replayer):
+        """Serve requests from recorded traffic, polling at the replay speed."""
+        self.replayer = replayer
+        self.set_update_interval()
+
+    def stop_replay(self):
+        """Go back to requesting the real backend."""
+        self.replayer = None
+        self.set_update_interval()
+
+    def set_update_interval(self):
+        """Pick the polling interval for the current update source."""
+        replayer = self.replayer
+        if replayer is not None and replayer.speed and replayer.poll_gap:
+            self.update_interval = timedelta(
+                seconds=max(replayer.poll_gap / replayer.speed, 1)
+            )
+        elif self.push_connected:
+            self.update_interval = timedelta(minutes=PUSH_POLL_INTERVAL)
+        else:
+            self.update_interval = self._live_update_interval
+
+    @callback
+    def async_push_connected(self) -> None:
+        """Slow polling down to a safety net while push updates arrive."""
+        self.push_connected = True
+        self.set_update_interval()
+
+    @callback
+    def async_push_disconnected(self, catch_up: bool = True) -> None:
+        """Fall back to regular polling and catch up on missed changes.
+
+        A deliberate stop passes `catch_up=False`, as the entry is unloading.
+        """
+        if not self.push_connected:
+            return
+        self.push_connected = False
+        self.set_update_interval()
+        if catch_up:
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def async_metadata_updated(self) -> None:
+        """Take over the session id and lobby doors of the metadata coordinator."""
+        self.session_id = self.metadata.data["session_id"]
+        self.lobby_door_data = self.metadata.data["lobby_doors"]
+
+    @callback
+    def async_apply_push(self, message) -> None:
+        """Patch device status from a push message and notify listeners."""
+        if self.data is None:
+            return
+        devices = None
+        if isinstance(message, dict):
+            devices = message.get("devices", [message])
+        if not isinstance(devices, list):
+            _LOGGER.debug("Ignoring malformed push message: %s", message)
+            return
+        indexed = self.data["indexed_devices"]
+        patches = {}
+        for patch in devices:
+            if not isinstance(patch, dict) or not isinstance(
+                patch.get("status"), dict
+            ):
+                _LOGGER.debug("Ignoring malformed push patch: %s", patch)
+                continue
+            idx = patch.get("idx")
+            if idx is None:
+                idx = next(
+                    (
+                        device["idx"]
+                        for device in indexed.values()
+                        if device["device_id"] == patch.get("device_id")
+                    ),
+                    None,
+                )
+            device = indexed.get(idx)
+            status = patch.get("status")
+            if device is None or not device["status"] or not status:
+                continue
+            if any(device["status"].get(key) != value for key, value in status.items()):
+                patches[idx] = {**patches.get(idx, {}), **status}
+        if patches:
+            self.async_patch_status(patches)
+            self.async_set_updated_data(self.data)
+
+    def apply_command(self, idx, changes) -> None:
+        """Store the status a command set, from an executor thread."""
+        run_callback_threadsafe(
+            self.hass.loop, self.async_apply_command, idx, changes
+        ).result()
+
+    @callback
+    def async_apply_command(self, idx, changes) -> None:
+        """Store the status a command set and notify the device's listeners."""
+        if self.data is None or idx not in self.data["indexed_devices"]:
+            return
+        self.async_patch_status({idx: changes})
+        with self.span("listener fan-out"):
+            for update_callback, context in list(self._listeners.values()):
+                if context == idx:
+                    update_callback()
+        self.async_fire_device_changes()
+
+    @callback
+    def async_patch_status(self, patches) -> None:
+        """Swap in a snapshot with the {idx: status changes} applied."""
+        previous = self.data["indexed_devices"]
+        self.data = with_status(self.data, patches)
+        indexed = self.data["indexed_devices"]
+        self.changed_idx = set(patches)
+        self.collect_device_changes(previous, indexed)
+        self.changed_groups = self.aggregates.update(
+            indexed[idx] for idx in patches if indexed[idx]["type"] != "acs"
+        )
 
     async def _async_update_data(self):
         """Fetch data from API endpoint.
@@ -72,101 +488,229 @@ class MyCoordinator(update_coordinator.DataUpdateCoordinator):
         """
         # Note: asyncio.TimeoutError and aiohttp.ClientError are already
         # handled by the data update coordinator.
-        async with async_timeout.timeout(10):
-            # Grab active context variables to limit data required to be fetched from API
-            # Note: using context is not required if there is no need or ability to limit
-            # data retrieved from API.
-            data = await self.hass.async_add_executor_job(self.get_xi_home_api_data)
+        profiler = self.profiler
+        try:
+            with self.span("poll cycle"):
+                budget = self.options[CONF_POLL_TIMEOUT]
+                async with async_timeout.timeout(budget + POLL_GRACE):
+                    # Grab active context variables to limit data required to be fetched from API
+                    # Note: using context is not required if there is no need or ability to limit
+                    # data retrieved from API.
+                    data = await self.hass.async_add_executor_job(
+                        self.get_xi_home_api_data
+                    )
+                with self.span("aggregates"):
+                    self.update_aggregates(data)
+                self.update_topology(data)
             return data
+        finally:
+            if profiler is not None:
+                profiler.cycle_done()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners, then fire the device changes.
+
+        Listeners of devices the last poll no longer listed are skipped;
+        their entities are removed after the fan-out.
+        """
+        removed, self.removed_idx = self.removed_idx, set()
+        added, self.added_devices = self.added_devices, []
+        expired, self.expired_idx = self.expired_idx, set()
+        with self.span("listener fan-out"):
+            if removed:
+                for update_callback, context in list(self._listeners.values()):
+                    if context not in removed:
+                        update_callback()
+            else:
+                super().async_update_listeners()
+        self.async_fire_device_changes()
+        if added or removed or expired:
+            self.async_update_topology(added, removed, expired)
+
+    @callback
+    def async_fire_device_changes(self) -> None:
+        """Fire the device changed events collected since the last call."""
+        changes, self.device_changes = self.device_changes, []
+        for event_data in changes:
+            self.hass.bus.async_fire(EVENT_DEVICE_CHANGED, event_data)
+
+    @callback
+    def async_update_topology(self, added, removed, expired) -> None:
+        """Add the entities of new devices and remove those of removed ones.
+
+        Entities of removed devices are left unavailable right away, but
+        their registry entries are only deleted once the device has stayed
+        away for DEVICE_REMOVE_DELAY, as list-redis may skip it briefly.
+        """
+        if added and self.entry_id is not None:
+            async_register_rooms(self.hass, self.entry_id, self.data["groups"])
+            async_dispatcher_send(self.hass, SIGNAL_DEVICES_ADDED, added)
+        for idx in removed:
+            for entity in self.entities.pop(idx, []):
+                if entity.hass is not None:
+                    self.hass.async_create_task(entity.async_remove())
+        if expired:
+            entity_registry = er.async_get(self.hass)
+            for idx in expired:
+                _since, entity_ids = self.missing.pop(idx, (None, []))
+                for entity_id in entity_ids:
+                    if entity_registry.async_get(entity_id) is not None:
+                        entity_registry.async_remove(entity_id)
+            async_dispatcher_send(self.hass, SIGNAL_DEVICES_REMOVED, expired)
+
+    def write_filter(self, deadband_option):
+        """Create a write filter using the configured deadband and intervals."""
+        write_filter = WriteFilter(
+            self.options[deadband_option],
+            self.options[CONF_MIN_WRITE_INTERVAL],
+            self.options[CONF_FORCE_WRITE_INTERVAL],
+        )
+        self.write_filters[write_filter] = deadband_option
+        return write_filter
+
+    def update_aggregates(self, data):
+        """Find the devices that changed since the last poll and aggregate them.
+
+        Acs devices are left to the air quality coordinator, as their
+        list-redis readings are not correct.
+        """
+        previous = self.data["indexed_devices"] if self.data else {}
+        indexed = data["indexed_devices"]
+        self.changed_idx = {
+            idx
+            for idx, device in indexed.items()
+            if idx not in previous or previous[idx]["status"] != device["status"]
+        }
+        self.changed_groups = self.aggregates.update(
+            indexed[idx] for idx in self.changed_idx if indexed[idx]["type"] != "acs"
+        )
+        for idx in previous.keys() - indexed.keys():
+            self.changed_groups |= self.aggregates.remove(idx)
+        self.collect_device_changes(previous, indexed)
+
+    def collect_device_changes(self, previous, indexed):
+        """Queue an event for each changed device with its changed fields.
+
+        Devices that are new in `indexed` have nothing to compare with.
+        """
+        for idx in self.changed_idx:
+            if idx not in previous:
+                continue
+            device = indexed[idx]
+            changes = status_changes(previous[idx]["status"], device["status"])
+            if changes:
+                self.device_changes.append(
+                    {
+                        "idx": idx,
+                        "device": device["device_id"],
+                        "type": device["type"],
+                        "group": device["group"],
+                        "changes": changes,
+                    }
+                )
+
+    def update_topology(self, data):
+        """Find the devices added or removed since the last poll."""
+        if self.data is None:
+            return
+        previous = self.data["indexed_devices"]
+        indexed = data["indexed_devices"]
+        self.added_devices = [indexed[idx] for idx in indexed.keys() - previous.keys()]
+        self.removed_idx = previous.keys() - indexed.keys()
+        now = time.monotonic()
+        for idx, (since, _entity_ids) in list(self.missing.items()):
+            if idx in indexed:
+                del self.missing[idx]
+                self.expired_idx.discard(idx)
+            elif now - since >= DEVICE_REMOVE_DELAY:
+                self.expired_idx.add(idx)
+        for idx in self.removed_idx:
+            self.acs_mergers.pop(idx, None)
+            self.missing[idx] = (
+                now,
+                [entity.entity_id for entity in self.entities.get(idx, [])],
+            )
+        if self.added_devices or self.removed_idx:
+            _LOGGER.info(
+                "%d devices added, %d removed",
+                len(self.added_devices),
+                len(self.removed_idx),
+            )
 
     def get_xi_home_api_data(self):
         """Get the latest data from xi_home."""
-        if self.session_id is None:
-            self.session_id = self.get_xi_home_session_id()
-
-        if self.lobby_door_data is None:
-            self.lobby_door_data = self.get_lobby_door_data()
+        profiler = self.profiler
+        if profiler is None:
+            return self._get_xi_home_api_data()
+        with profiler.profile():
+            return self._get_xi_home_api_data()
 
-        body = {"sessionid": self.session_id, "userid": self.user_id}
+    def _get_xi_home_api_data(self):
+        """Fetch and index the device list within the poll time budget."""
+        deadline = time.monotonic() + self.options[CONF_POLL_TIMEOUT]
+        body = list_body(self.session_id, self.user_id)
 
-        data = request_data("/device/list-redis", self.token, body)
-        indexed = dict()
+        data, self._seed_data = self._seed_data, None
+        seeded = data is not None
+        if not seeded:
+            data = self.request("/device/list-redis", body, deadline=deadline)
+        # a warm state keeps the time its devices were actually fetched
+        now = data.setdefault("fetched_at", dt_util.utcnow())
         for device in data["devices"]:
+            device.setdefault("fetched_at", now)
             if device["type"] == "acs" and device["status"]:
-                # acs data from list-redis api is not correct
-                acs_data = self.get_acs_data(device["device_id"], device["groupID"])
-                device["status"]["dust_value"] = acs_data["dust_value"]
-                device["status"]["co2_value"] = acs_data["co2_value"]
-                device["status"]["smell_value"] = acs_data["smell_value"]
-                device["status"]["dust_unit"] = acs_data["dust_unit"]
-
-                if device["status"]["dust_unit"] != "PM2.5":
-                    self.acs_change_unit(
-                        device["device_id"], device["groupID"], "PM2.5"
-                    )
-                    acs_data = self.get_acs_data(device["device_id"], device["groupID"])
-                    device["status"]["dust_value"] = acs_data["dust_value"]
-                    device["status"]["dust_unit"] = acs_data["dust_unit"]
-                if "fau_mode" not in device["status"]:
-                    device["status"]["fau_mode"] = ""
-                if "erv_mode" not in device["status"]:
-                    device["status"]["erv_mode"] = ""
-                if "fau_airvolume" not in device["status"]:
-                    device["status"]["fau_airvolume"] = 0
-                if "erv_airvolume" not in device["status"]:
-                    device["status"]["erv_airvolume"] = 0
-
-            indexed[device["idx"]] = device
-
-        data["indexed_devices"] = indexed
-        return data
-
-    def acs_change_unit(self, device_id, group_id, unit):
-        """Chance unit of acs device."""
-        body = {
-            "device_id": device_id,
-            "type": "acs",
-            "groupId": group_id,
-            "status": {
-                "dust_unit": unit,
-                "fau_runstate": 0,
-                "erv_runstate": 0,
-                "fau_mode": "",
-                "erv_mode": "",
-                "fau_air_volume": 0,
-                "erv_air_volume": 0,
-            },
-            "userid": self.user_id,
-        }
-        _response = request_data("/device/command", self.token, body)
-
-    def get_acs_data(self, device_id, group_id):
-        """Get acs data from xi_home."""
-        body = {
-            "device_id": device_id,
-            "type": "acs",
-            "groupId": group_id,
-            "userid": self.user_id,
-        }
-        response = request_data("/device/status", self.token, body)
-        return response["status"]
+                normalize_acs_status(device["status"])
+        if seeded:
+            return freeze_data(data)
+
+        timestamp = now.timestamp()
+        self.record_history(
+            (
+                "{}.{}".format(device["idx"], field),
+                timestamp,
+                float(device["status"][field]),
+            )
+            for device in data["devices"]
+            if device["type"] == "heating-system" and device["status"]
+            for field in HEATING_STORE_FIELDS
+        )
+        return freeze_data(data)
 
-    def get_lobby_door_data(self):
-        """Get lobby door data from xi_home."""
-        body = {"type": "doorlock", "userid": self.user_id}
-        response = request_data("/public", self.token, body)
-        return response["data"]["list"]
 
-    def get_xi_home_session_id(self):
-        """Get session id from xi_home."""
-        body = {"userid": self.user_id}
-        response = request_data("/auth/user", self.token, body)
-        return response["sessionid"]
+def normalize_acs_status(status):
+    """Fill in the fan fields list-redis leaves out for idle acs devices."""
+    if "fau_mode" not in status:
+        status["fau_mode"] = ""
+    if "erv_mode" not in status:
+        status["erv_mode"] = ""
+    if "fau_airvolume" not in status:
+        status["fau_airvolume"] = 0
+    if "erv_airvolume" not in status:
+        status["erv_airvolume"] = 0
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].data.pop(entry.entry_id)
+        coordinator = hass.data.pop(DOMAIN)
+        async_unload_services(hass)
+        # a capture left open would lack its gzip trailer
+        await async_close_recorder(hass, coordinator)
+        if not hass.is_stopping:
+            # a reload within HANDOFF_TTL starts from this state
+            handoffs = hass.data.setdefault(DATA_HANDOFF, {})
+            now = time.monotonic()
+            for user_id, handoff in list(handoffs.items()):
+                if now - handoff["time"] >= HANDOFF_TTL:
+                    del handoffs[user_id]
+            handoffs[coordinator.user_id] = coordinator.warm_state()
+        await hass.async_add_executor_job(coordinator.close_transports)
+        await hass.async_add_executor_job(close_sessions)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Drop the state the unload of a removed entry handed off."""
+    hass.data.get(DATA_HANDOFF, {}).pop(entry.data["username"], None)
@@ -0,0 +1,94 @@
+"""Per-room and whole-home aggregates of device status."""
+from __future__ import annotations
+
+HOME_GROUP = "home"
+
+LIGHTS_ON = "lights_on"
+HEATING_ON = "heating_on"
+WORST_PM25 = "worst_pm25"
+WORST_CO2 = "worst_co2"
+
+# aggregate -> device types contributing to it
+AGGREGATE_TYPES = {
+    LIGHTS_ON: ("light", "dimming"),
+    HEATING_ON: ("heating-system",),
+    WORST_PM25: ("acs",),
+    WORST_CO2: ("acs",),
+}
+
+
+def contribution(device) -> dict | None:
+    """Return what a device adds to the aggregates of its group."""
+    status = device["status"]
+    if not status:
+        return None
+    if device["type"] in AGGREGATE_TYPES[LIGHTS_ON]:
+        return {LIGHTS_ON: 1 if status["power"] else 0}
+    if device["type"] in AGGREGATE_TYPES[HEATING_ON]:
+        return {HEATING_ON: 1 if status["mode"] else 0}
+    if device["type"] in AGGREGATE_TYPES[WORST_PM25]:
+        return {
+            WORST_PM25: int(status["dust_value"]),
+            WORST_CO2: int(status["co2_value"]),
+        }
+    return None
+
+
+class GroupAggregates:
+    """Aggregates kept up to date from the devices that changed.
+
+    Counts are adjusted by the difference a device makes, so an update
+    costs O(changed devices); worst values are recomputed only over the
+    few acs devices of an affected group.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty aggregates."""
+        self._counts: dict[str, dict[str, int]] = {}
+        self._worst: dict[str, dict[str, dict[int, int]]] = {}
+        self._contributions: dict[int, tuple[str, dict]] = {}
+
+    def update(self, devices) -> set[str]:
+        """Apply changed devices and return the groups whose values changed."""
+        changed = set()
+        for device in devices:
+            new = contribution(device)
+            old_group, old = self._contributions.get(device["idx"], (None, None))
+            if new == old and old_group == device["group"]:
+                continue
+            if old is not None:
+                self._apply(device["idx"], old_group, old, -1)
+                changed |= {old_group, HOME_GROUP}
+            if new is None:
+                self._contributions.pop(device["idx"], None)
+            else:
+                self._contributions[device["idx"]] = (device["group"], new)
+                self._apply(device["idx"], device["group"], new, 1)
+                changed |= {device["group"], HOME_GROUP}
+        return changed
+
+    def remove(self, idx: int) -> set[str]:
+        """Forget a device that disappeared and return the groups that changed."""
+        group, old = self._contributions.pop(idx, (None, None))
+        if old is None:
+            return set()
+        self._apply(idx, group, old, -1)
+        return {group, HOME_GROUP}
+
+    def _apply(self, idx, group, values, sign) -> None:
+        for target in (group, HOME_GROUP):
+            for key, value in values.items():
+                if key in (LIGHTS_ON, HEATING_ON):
+                    counts = self._counts.setdefault(target, {})
+                    counts[key] = counts.get(key, 0) + sign * value
+                elif sign > 0:
+                    self._worst.setdefault(target, {}).setdefault(key, {})[idx] = value
+                else:
+                    self._worst.get(target, {}).get(key, {}).pop(idx, None)
+
+    def value(self, group: str, key: str) -> int | None:
+        """Return one aggregate of a group."""
+        if key in (LIGHTS_ON, HEATING_ON):
+            return self._counts.get(group, {}).get(key, 0)
+        values = self._worst.get(group, {}).get(key)
+        return max(values.values()) if values else None
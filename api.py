@@ -0,0 +1,71 @@
+"""Request bodies of the xi_home api.
+
+Shared by the integration and the standalone client (client.py), and
+free of Home Assistant imports.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+
+def auth_body(user_id: str) -> dict[str, Any]:
+    """Return the body of a /auth/user login."""
+    return {"userid": user_id}
+
+
+def list_body(session_id: str, user_id: str) -> dict[str, Any]:
+    """Return the body of a /device/list-redis request."""
+    return {"sessionid": session_id, "userid": user_id}
+
+
+def status_body(device_id, group_id, device_type, user_id) -> dict[str, Any]:
+    """Return the body of a /device/status request."""
+    return {
+        "device_id": device_id,
+        "type": device_type,
+        "groupId": group_id,
+        "userid": user_id,
+    }
+
+
+def command_body(device_id, group_id, device_type, status, user_id) -> dict[str, Any]:
+    """Return the body of a /device/command setting `status`."""
+    return {
+        "device_id": device_id,
+        "type": device_type,
+        "groupId": group_id,
+        "status": status,
+        "userid": user_id,
+    }
+
+
+def acs_unit_status(unit: str) -> dict[str, Any]:
+    """Return the command status switching the dust unit of an acs device.
+
+    The acs only accepts the unit together with its fan state, which the
+    command also switches off.
+    """
+    return {
+        "dust_unit": unit,
+        "fau_runstate": 0,
+        "erv_runstate": 0,
+        "fau_mode": "",
+        "erv_mode": "",
+        "fau_air_volume": 0,
+        "erv_air_volume": 0,
+    }
+
+
+def lobby_doors_body(user_id: str) -> dict[str, Any]:
+    """Return the /public body listing the lobby doors."""
+    return {"type": "doorlock", "userid": user_id}
+
+
+def elevator_body(user_id: str) -> dict[str, Any]:
+    """Return the /public body calling the elevator."""
+    return {"type": "elevator", "userid": user_id}
+
+
+def open_lobby_body(lobbydong: str, lobbyho: str, user_id: str) -> dict[str, Any]:
+    """Return the /public/openlobby body opening a lobby door."""
+    return {"door": "{}&{}".format(lobbydong, lobbyho), "userid": user_id}
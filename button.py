@@ -4,13 +4,14 @@ from __future__ import annotations
 import logging
 
 from homeassistant.components.button import ButtonEntity
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
-from .const import DOMAIN
-from .helper import request_data
+from .api import elevator_body, open_lobby_body
+from .const import DOMAIN, SIGNAL_DEVICES_ADDED
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -22,14 +23,23 @@ async def async_setup_entry(
 ) -> None:
     """Setup buttons"""
     coordinator = hass.data[DOMAIN]
-    entities = []
-    for device in coordinator.data["devices"]:
-        if device["type"] == "public-elevator":
-            entities.append(XiHomeElevatorButton(device, coordinator))
-    for door in coordinator.lobby_door_data:
-        entities.append(XiHomeDoorButton(door, coordinator))
 
-    async_add_entities(entities)
+    @callback
+    def async_add_devices(devices) -> None:
+        entities = []
+        for device in devices:
+            if device["type"] == "public-elevator":
+                entities.append(XiHomeElevatorButton(device, coordinator))
+        coordinator.track_entities(entities)
+        async_add_entities(entities)
+
+    async_add_devices(coordinator.data["devices"])
+    config_entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_DEVICES_ADDED, async_add_devices)
+    )
+    async_add_entities(
+        [XiHomeDoorButton(door, coordinator) for door in coordinator.lobby_door_data]
+    )
 
 
 class XiHomeElevatorButton(ButtonEntity):
@@ -41,35 +51,16 @@ class XiHomeElevatorButton(ButtonEntity):
         self.coordinator = coordinator
 
         self.entity_id = "button." + device_data["device_id"]
-        self._name = "Elevator"
+        self._attr_name = "Elevator"
         self._device_id = device_data["device_id"]
         self._group = device_data["group"]
         self._type = device_data["type"]
-
-    @property
-    def name(self) -> str:
-        """Return the display name of this button."""
-        return self._name
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique, Home Assistant friendly identifier for this entity."""
-        return self._device_id + str(self.idx)
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._group)},
-        )
+        self._attr_unique_id = self._device_id + str(self.idx)
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, self._group)})
 
     def press(self) -> None:
         """Handle the button press."""
-        body = {
-            "type": "elevator",
-            "userid": self.coordinator.user_id,
-        }
-        request_data("/public", self.coordinator.token, body)
+        self.coordinator.request("/public", elevator_body(self.coordinator.user_id))
 
 
 class XiHomeDoorButton(ButtonEntity):
@@ -84,29 +75,11 @@ class XiHomeDoorButton(ButtonEntity):
         self._group = "public"
 
         self.entity_id = "button." + self._lobbydong + self._comment.split(" ")[-1]
-        self._name = "{}-{}".format(self._lobbydong, self._comment.split(" ")[-1])
-
-    @property
-    def name(self) -> str:
-        """Return the display name of this button."""
-        return self._name
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique, Home Assistant friendly identifier for this entity."""
-        return self._lobbyho + self._lobbydong
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._group)},
-        )
+        self._attr_name = "{}-{}".format(self._lobbydong, self._comment.split(" ")[-1])
+        self._attr_unique_id = self._lobbyho + self._lobbydong
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, self._group)})
 
     def press(self) -> None:
         """Handle the button press."""
-        body = {
-            "door": "{}&{}".format(self._lobbydong, self._lobbyho),
-            "userid": self.coordinator.user_id,
-        }
-        request_data("/public/openlobby", self.coordinator.token, body)
+        body = open_lobby_body(self._lobbydong, self._lobbyho, self.coordinator.user_id)
+        self.coordinator.request("/public/openlobby", body)
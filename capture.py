@@ -0,0 +1,118 @@
+"""Record and replay of xi_home api traffic."""
+from __future__ import annotations
+
+import copy
+import gzip
+import json
+import logging
+import threading
+import time
+
+_LOGGER = logging.getLogger(__name__)
+
+SCRUBBED = "<scrubbed>"
+# keys holding credentials or personal data, replaced in both requests and responses
+SCRUB_KEYS = {"userid", "user_id", "sessionid", "token", "authorization", "phone"}
+
+
+def scrub(value):
+    """Return a copy of `value` with credentials and user ids replaced."""
+    if isinstance(value, dict):
+        return {
+            key: SCRUBBED if key.lower() in SCRUB_KEYS else scrub(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [scrub(item) for item in value]
+    return value
+
+
+def request_key(path, body):
+    """Return the key identifying requests that should get the same response."""
+    return path + " " + json.dumps(scrub(body), sort_keys=True)
+
+
+class TrafficRecorder:
+    """Append scrubbed request/response pairs to a gzipped JSON lines file."""
+
+    def __init__(self, filename: str) -> None:
+        """Initialize a TrafficRecorder writing to `filename`."""
+        self.filename = filename
+        self.count = 0
+        self._start = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = gzip.open(filename, "at", encoding="utf-8")
+
+    def record(self, path, body, response, elapsed: float) -> None:
+        """Write one request/response pair, unless the recorder was closed."""
+        line = json.dumps(
+            {
+                "t": round(time.monotonic() - self._start - elapsed, 3),
+                "elapsed": round(elapsed, 3),
+                "path": path,
+                "body": scrub(body),
+                "response": scrub(response),
+            },
+            separators=(",", ":"),
+        )
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.write(line + "\n")
+            self.count += 1
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        with self._lock:
+            self._file.close()
+
+
+class TrafficReplayer:
+    """Answer api requests from a file written by TrafficRecorder.
+
+    Identical requests get their recorded responses in order, wrapping
+    around when exhausted. Each answer is delayed by the recorded latency
+    divided by `speed`; a speed of 0 answers immediately.
+    """
+
+    def __init__(self, filename: str, speed: float = 1.0) -> None:
+        """Initialize a TrafficReplayer reading `filename`."""
+        self.filename = filename
+        self.speed = speed
+        self._responses: dict[str, list] = {}
+        self._by_path: dict[str, list] = {}
+        self._positions: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.poll_gap = None
+
+        list_times = []
+        with gzip.open(filename, "rt", encoding="utf-8") as file:
+            for line in file:
+                entry = json.loads(line)
+                item = (entry["elapsed"], entry["response"])
+                key = request_key(entry["path"], entry["body"])
+                self._responses.setdefault(key, []).append(item)
+                self._by_path.setdefault(entry["path"], []).append(item)
+                if entry["path"] == "/device/list-redis":
+                    list_times.append(entry["t"])
+        if len(list_times) > 1:
+            self.poll_gap = (list_times[-1] - list_times[0]) / (len(list_times) - 1)
+
+    def request(self, path, body):
+        """Return the next recorded response for this request."""
+        key = request_key(path, body)
+        items = self._responses.get(key)
+        if items is None:
+            # commands with other values than recorded: fall back to the path
+            key = path
+            items = self._by_path.get(path)
+        if items is None:
+            _LOGGER.debug("No recorded response for %s", path)
+            return {"result": 0}
+        with self._lock:
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+        elapsed, response = items[position % len(items)]
+        if self.speed:
+            time.sleep(elapsed / self.speed)
+        return copy.deepcopy(response)
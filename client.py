@@ -0,0 +1,222 @@
+"""Standalone async client for the xi_home api.
+
+Does not need Home Assistant, only aiohttp. One client talks for one
+account; clients for many accounts can share an aiohttp session and a
+concurrency limit:
+
+    async with aiohttp.ClientSession() as session:
+        limiter = asyncio.Semaphore(20)
+        client = XiHomeClient(token, user_id, session=session, limiter=limiter)
+        devices = await client.devices()
+
+`XiHomeSyncClient` offers the same methods for blocking code.
+"""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, TypedDict
+
+import aiohttp
+
+from .api import (
+    acs_unit_status,
+    auth_body,
+    command_body,
+    elevator_body,
+    list_body,
+    lobby_doors_body,
+    open_lobby_body,
+    status_body,
+)
+from .const import API_PREFIX, RETRY, TIMEOUT
+
+# default number of requests in flight per client
+CONCURRENCY = 10
+# server errors that are retried, after 0s, 10s, 20s, 40s... as helper.py does
+RETRY_STATUSES = {500, 502, 503, 504}
+BACKOFF_FACTOR = 5
+
+
+class Device(TypedDict):
+    """A device of a /device/list-redis response."""
+
+    idx: int
+    device_id: str
+    groupID: int
+    group: str
+    type: str
+    name: str
+    status: dict[str, Any]
+
+
+class Devices(TypedDict):
+    """A /device/list-redis response."""
+
+    groups: list[dict[str, Any]]
+    devices: list[Device]
+
+
+class LobbyDoor(TypedDict):
+    """A lobby door of the building."""
+
+    lobbyHo: str
+    lobbydong: str
+    comment: str
+
+
+class XiHomeError(Exception):
+    """Error to indicate the api refused a request."""
+
+
+class XiHomeAuthError(XiHomeError):
+    """Error to indicate the token or user id is not valid."""
+
+
+class XiHomeClient:
+    """Async client for one xi_home account.
+
+    Without a `session` the client opens its own, pooling up to
+    `concurrency` connections, and closes it in `close`. `limiter` caps the
+    requests in flight and may be shared between clients.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        user_id: str,
+        session: aiohttp.ClientSession | None = None,
+        limiter: asyncio.Semaphore | None = None,
+        concurrency: int = CONCURRENCY,
+        api_prefix: str = API_PREFIX,
+        timeout: float = TIMEOUT,
+        retry: int = RETRY,
+    ) -> None:
+        """Initialize a XiHomeClient."""
+        self.token = token
+        self.user_id = user_id
+        self.session_id: str | None = None
+        self.api_prefix = api_prefix
+        self.timeout = timeout
+        self.retry = retry
+        self.requests = 0
+        self._session = session
+        self._own_session = session is None
+        self._concurrency = concurrency
+        self._limiter = limiter or asyncio.Semaphore(concurrency)
+
+    async def __aenter__(self) -> XiHomeClient:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the session if the client opened it."""
+        if self._own_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def request(self, path: str, body: dict[str, Any]) -> Any:
+        """Send a request and return the decoded response."""
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._concurrency)
+            )
+        headers = {"authorization": "Bearer {}".format(self.token)}
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        for attempt in range(self.retry + 1):
+            if attempt > 1:
+                await asyncio.sleep(BACKOFF_FACTOR * 2 ** (attempt - 1))
+            async with self._limiter:
+                self.requests += 1
+                async with self._session.post(
+                    self.api_prefix + path, json=body, headers=headers, timeout=timeout
+                ) as response:
+                    if response.status in RETRY_STATUSES and attempt < self.retry:
+                        continue
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+
+    async def login(self) -> str:
+        """Log in and return the session id."""
+        response = await self.request("/auth/user", auth_body(self.user_id))
+        if response["result"] != 0:
+            raise XiHomeAuthError("Login failed: {}".format(response["result"]))
+        self.session_id = response["sessionid"]
+        return self.session_id
+
+    async def devices(self) -> Devices:
+        """Return the rooms and devices with their status, logging in first."""
+        if self.session_id is None:
+            await self.login()
+        return await self.request(
+            "/device/list-redis", list_body(self.session_id, self.user_id)
+        )
+
+    async def device_status(
+        self, device_id: str, group_id: int, device_type: str = "acs"
+    ) -> dict[str, Any]:
+        """Return the status of one device; acs devices include air quality."""
+        body = status_body(device_id, group_id, device_type, self.user_id)
+        response = await self.request("/device/status", body)
+        return response["status"]
+
+    async def command(
+        self, device_id: str, group_id: int, device_type: str, status: dict[str, Any]
+    ) -> Any:
+        """Set status fields of a device."""
+        body = command_body(device_id, group_id, device_type, status, self.user_id)
+        return await self.request("/device/command", body)
+
+    async def acs_change_unit(self, device_id: str, group_id: int, unit: str) -> Any:
+        """Switch the dust unit of an acs device, which also switches it off."""
+        return await self.command(device_id, group_id, "acs", acs_unit_status(unit))
+
+    async def lobby_doors(self) -> list[LobbyDoor]:
+        """Return the lobby doors of the building."""
+        response = await self.request("/public", lobby_doors_body(self.user_id))
+        return response["data"]["list"]
+
+    async def open_lobby_door(self, lobbydong: str, lobbyho: str) -> Any:
+        """Open a lobby door."""
+        body = open_lobby_body(lobbydong, lobbyho, self.user_id)
+        return await self.request("/public/openlobby", body)
+
+    async def call_elevator(self) -> Any:
+        """Call the elevator to the apartment's floor."""
+        return await self.request("/public", elevator_body(self.user_id))
+
+
+class XiHomeSyncClient:
+    """Blocking wrapper of XiHomeClient, running it on a private event loop.
+
+    Has the same methods, without `await`. Not for use inside a running
+    event loop.
+    """
+
+    def __init__(self, token: str, user_id: str, **kwargs: Any) -> None:
+        """Initialize a XiHomeSyncClient; see XiHomeClient for the options."""
+        self._loop = asyncio.new_event_loop()
+        self._client = XiHomeClient(token, user_id, **kwargs)
+
+    def __enter__(self) -> XiHomeSyncClient:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __getattr__(self, name: str):
+        method = getattr(self._client, name)
+        if not asyncio.iscoroutinefunction(method):
+            return method
+
+        def call(*args, **kwargs):
+            return self._loop.run_until_complete(method(*args, **kwargs))
+
+        call.__doc__ = method.__doc__
+        return call
+
+    def close(self) -> None:
+        """Close the client and its event loop."""
+        self._loop.run_until_complete(self._client.close())
+        self._loop.close()
@@ -3,18 +3,19 @@ from __future__ import annotations
 
 import logging
 from typing import Any
+
 from homeassistant.components.climate import ClimateEntity
 from homeassistant.components.climate import HVACMode, ClimateEntityFeature
 
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature, PRECISION_WHOLE
 
-from .const import DOMAIN
-from .helper import request_data
+from .const import CONF_TEMPERATURE_DEADBAND, DOMAIN, SIGNAL_DEVICES_ADDED
 
 # erv
 VENTILATION_OFF = "Ventilation Off"
@@ -49,6 +50,11 @@ COMMAND_VALUES = {
     VENTILATION_SLEEP: [1, 0, "sleep"],
 }
 
+# heating-system "mode" values; away and reservation modes are left out
+# until their values are confirmed from captured app traffic
+HEATING_MODE_OFF = 0
+HEATING_MODE_HEAT = 1
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -59,12 +65,20 @@ async def async_setup_entry(
 ) -> None:
     """Setup heating systems"""
     coordinator = hass.data[DOMAIN]
-    entities = []
-    for device in coordinator.data["devices"]:
-        if device["type"] == "heating-system":
-            entities.append(XiHomeHeatingSystem(device, coordinator))
 
-    async_add_entities(entities)
+    @callback
+    def async_add_devices(devices) -> None:
+        entities = []
+        for device in devices:
+            if device["type"] == "heating-system":
+                entities.append(XiHomeHeatingSystem(device, coordinator))
+        coordinator.track_entities(entities)
+        async_add_entities(entities)
+
+    async_add_devices(coordinator.data["devices"])
+    config_entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_DEVICES_ADDED, async_add_devices)
+    )
 
 
 class XiHomeHeatingSystem(CoordinatorEntity, ClimateEntity):
@@ -79,29 +93,31 @@ class XiHomeHeatingSystem(CoordinatorEntity, ClimateEntity):
         self._group_id = device_data["groupID"]
         self._group = device_data["group"]
         self._type = device_data["type"]
-        self._name = "{} Heating System".format(device_data["group"])
+        self._attr_name = "{} Heating System".format(device_data["group"])
         self._device_id = device_data["device_id"]
+        self._attr_unique_id = self._device_id + str(self.idx)
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, self._group)})
         self._current_temperature = int(device_data["status"]["curtemp"])
         self._target_temperature = int(device_data["status"]["settemp"])  # minimum 5
 
-        self._temperature_unit = UnitOfTemperature.CELSIUS
-        self._precision = PRECISION_WHOLE
-        self._hvac_modes = [HVACMode.OFF, HVACMode.HEAT]
+        self._attr_temperature_unit = UnitOfTemperature.CELSIUS
+        self._attr_precision = PRECISION_WHOLE
+        self._attr_hvac_modes = [HVACMode.OFF, HVACMode.HEAT]
         self._current_hvac_mode = (
             HVACMode.HEAT if device_data["status"]["power"] else HVACMode.OFF
         )
-        self._supported_features = (
+        self._mode = int(device_data["status"]["mode"])
+        self._attr_supported_features = (
             ClimateEntityFeature.TURN_OFF | ClimateEntityFeature.TURN_ON |
             ClimateEntityFeature.TARGET_TEMPERATURE
         )
         self._enable_turn_on_off_backwards_compatibility = False
-        self._min_temp = 5
-        self._max_temp = 40
-
-    @property
-    def name(self) -> str:
-        """Return the display name of this heater."""
-        return self._name
+        self._attr_min_temp = 5
+        self._attr_max_temp = 40
+        self._write_filter = coordinator.write_filter(CONF_TEMPERATURE_DEADBAND)
+        self._write_filter.record(self._current_temperature)
+        self._last_available = self.coordinator.last_update_success
+        self._update_attributes()
 
     @property
     def is_on(self) -> bool | None:
@@ -109,67 +125,22 @@ class XiHomeHeatingSystem(CoordinatorEntity, ClimateEntity):
         return self._current_hvac_mode != HVACMode.OFF
 
     @property
-    def unique_id(self) -> str:
-        """Return a unique, Home Assistant friendly identifier for this entity."""
-        return self._device_id + str(self.idx)
-
-    @property
-    def current_temperature(self):
-        """Return the sensor temperature."""
-        return self._current_temperature
-
-    @property
-    def target_temperature(self):
-        """Return the temperature we try to reach."""
-        return self._target_temperature
-
-    @property
-    def temperature_unit(self):
-        """Return the temperature unit."""
-        return self._temperature_unit
-
-    @property
-    def precision(self):
-        """Return the temperature precision."""
-        return self._precision
-
-    @property
-    def hvac_modes(self):
-        """Return the available HVAC modes."""
-        return self._hvac_modes
-
-    @property
-    def hvac_mode(self):
-        """Return the current HVAC mode."""
-        return self._current_hvac_mode
-
-    @property
-    def supported_features(self):
-        """Return supported features."""
-        return self._supported_features
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the suppressed state writes."""
+        return {"suppressed_writes": self._write_filter.suppressed}
 
-    @property
-    def max_temp(self):
-        """Return maximum available temperature."""
-        return self._max_temp
-
-    @property
-    def min_temp(self):
-        """Return minimum available temperature."""
-        return self._min_temp
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._group)},
-        )
+    def _update_attributes(self) -> None:
+        """Derive the entity attributes from the device state."""
+        self._attr_current_temperature = self._current_temperature
+        self._attr_target_temperature = self._target_temperature
+        self._attr_hvac_mode = self._current_hvac_mode
 
     def set_temperature(self, **kwargs: Any):
         """Set new target temperature."""
         temp = kwargs.get(ATTR_TEMPERATURE)
         if temp is not None:
             self._target_temperature = int(temp)
+            self._update_attributes()
             if self.is_on:
                 self.turn_on()
 
@@ -180,51 +151,62 @@ class XiHomeHeatingSystem(CoordinatorEntity, ClimateEntity):
         elif self._current_hvac_mode == HVACMode.HEAT and hvac_mode == HVACMode.OFF:
             self.turn_off()
         self._current_hvac_mode = hvac_mode
+        self._update_attributes()
 
     def turn_on(self, **kwargs: Any) -> None:
         """Instruct the heating system to turn on."""
-        body = {
-            "device_id": self._device_id,
-            "type": self._type,
-            "groupId": self._group_id,
-            "status": {
-                "power": True,
-                "mode": 1,
-                "curtemp": self._current_temperature,
-                "settemp": self._target_temperature,
-            },
-            "userid": self.coordinator.user_id,
-        }
-        _response = request_data("/device/command", self.coordinator.token, body)
-        self._current_hvac_mode = HVACMode.HEAT
-        self.schedule_update_ha_state()
+        self.send_command(True, HEATING_MODE_HEAT, self._target_temperature)
 
     def turn_off(self, **kwargs: Any) -> None:
         """Instruct the heating system to turn on."""
+        self.send_command(False, HEATING_MODE_OFF, 5)
+
+    def send_command(self, power, mode, settemp) -> None:
+        """Send command by api"""
         body = {
             "device_id": self._device_id,
             "type": self._type,
             "groupId": self._group_id,
             "status": {
-                "power": False,
-                "mode": 0,
+                "power": power,
+                "mode": mode,
                 "curtemp": self._current_temperature,
-                "settemp": 5,
+                "settemp": settemp,
             },
             "userid": self.coordinator.user_id,
         }
-        _response = request_data("/device/command", self.coordinator.token, body)
-        self._current_hvac_mode = HVACMode.OFF
+        _response = self.coordinator.request("/device/command", body)
+        self._mode = mode
+        self._current_hvac_mode = HVACMode.HEAT if power else HVACMode.OFF
+        self._update_attributes()
         self.schedule_update_ha_state()
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
         data = self.coordinator.data["indexed_devices"][self.idx]
-        self._current_temperature = int(data["status"]["curtemp"])
-        self._current_hvac_mode = (
-            HVACMode.HEAT if data["status"]["mode"] else HVACMode.OFF
-        )
-        if self._current_hvac_mode == HVACMode.HEAT:
-            self._target_temperature = int(data["status"]["settemp"])
+        current_temperature = int(data["status"]["curtemp"])
+        mode = int(data["status"]["mode"])
+        hvac_mode = HVACMode.HEAT if mode else HVACMode.OFF
+        target_temperature = self._target_temperature
+        if hvac_mode == HVACMode.HEAT:
+            target_temperature = int(data["status"]["settemp"])
+
+        available = self.coordinator.last_update_success
+        if (
+            available != self._last_available
+            or mode != self._mode
+            or hvac_mode != self._current_hvac_mode
+            or target_temperature != self._target_temperature
+        ):
+            self._write_filter.record(current_temperature)
+        elif not self._write_filter.should_write(current_temperature):
+            return
+
+        self._last_available = available
+        self._current_temperature = current_temperature
+        self._current_hvac_mode = hvac_mode
+        self._mode = mode
+        self._target_temperature = target_temperature
+        self._update_attributes()
         self.async_write_ha_state()
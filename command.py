@@ -0,0 +1,143 @@
+"""Merging of ventilation and fresh air unit commands per acs device."""
+from __future__ import annotations
+
+import math
+import threading
+import time
+
+# seconds to wait for the other half of the acs before sending
+MERGE_WINDOW = 0.25
+# acs reserve timers count whole hours
+RESERVE_TIME_UNIT = 3600
+
+
+class _Batch:
+    """Changes collected for one command."""
+
+    def __init__(self) -> None:
+        self.changes: dict = {}
+        self.done = threading.Event()
+        self.error: Exception | None = None
+
+
+class AcsCommandMerger:
+    """Send the ERV and FAU changes of one acs device as a single command.
+
+    The first caller opens a batch and waits `MERGE_WINDOW` seconds for
+    other changes to the same device, then sends one /device/command for
+    all of them. Sends are serialised per device, and the half that did
+    not change is always filled in from the latest known status.
+    """
+
+    def __init__(self, coordinator, device_data) -> None:
+        """Initialize an AcsCommandMerger."""
+        self.coordinator = coordinator
+        self.idx = device_data["idx"]
+        self._device_id = device_data["device_id"]
+        self._group_id = device_data["groupID"]
+        self._type = device_data["type"]
+        self._batch: _Batch | None = None
+        self._batch_lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self.commands = 0
+        self.merged = 0
+        # wall clock time at which each half switches itself off
+        self.reserve_until = {"fau": None, "erv": None}
+
+    def reserve_remaining(self, half: str) -> int | None:
+        """Return the minutes left on the reserve timer of `half`."""
+        until = self.reserve_until[half]
+        if until is None or until <= time.time():
+            return None
+        return math.ceil((until - time.time()) / 60)
+
+    def send(self, changes: dict) -> None:
+        """Send `changes` (status keys as in list-redis), merged with others.
+
+        `fau_reserve_time` / `erv_reserve_time` set the reserve timer of that
+        half, in hours; 0 clears it. A running timer is kept across other
+        commands and dropped when its half is switched off.
+        """
+        with self._batch_lock:
+            batch = self._batch
+            leader = batch is None
+            if leader:
+                batch = self._batch = _Batch()
+            else:
+                self.merged += 1
+            batch.changes.update(changes)
+
+        if not leader:
+            batch.done.wait()
+            if batch.error is not None:
+                raise batch.error
+            return
+
+        time.sleep(MERGE_WINDOW)
+        with self._batch_lock:
+            self._batch = None
+        try:
+            with self._send_lock:
+                self._send(batch.changes)
+        except Exception as err:
+            batch.error = err
+            raise
+        finally:
+            batch.done.set()
+
+    def _send(self, changes: dict) -> None:
+        """Send one command and store the result in the coordinator data."""
+        status = self.coordinator.data["indexed_devices"][self.idx]["status"]
+        merged = {**status, **changes}
+        air_volume = {
+            key: int(changes.get(key, status[key]))
+            for key in ("fau_airvolume", "erv_airvolume")
+        }
+        now = time.time()
+        reserve_until = dict(self.reserve_until)
+        reserve_time = {}
+        for half in ("fau", "erv"):
+            key = half + "_reserve_time"
+            if key in changes:
+                hours = changes[key]
+                reserve_until[half] = now + hours * RESERVE_TIME_UNIT if hours else None
+            elif not merged[half + "_runstate"]:
+                reserve_until[half] = None
+            until = reserve_until[half]
+            if until is None or until <= now:
+                reserve_until[half] = None
+                reserve_time[key] = 0
+                continue
+            # the command always carries the timer, and the device restarts
+            # it from now in whole hours
+            reserve_time[key] = math.ceil((until - now) / RESERVE_TIME_UNIT)
+            reserve_until[half] = now + reserve_time[key] * RESERVE_TIME_UNIT
+        body = {
+            "device_id": self._device_id,
+            "type": self._type,
+            "groupId": self._group_id,
+            "status": {
+                "fau_runstate": merged["fau_runstate"],
+                "erv_runstate": merged["erv_runstate"],
+                "fau_mode": merged["fau_mode"],
+                "erv_mode": merged["erv_mode"],
+                "fau_air_volume": air_volume["fau_airvolume"],
+                "erv_air_volume": air_volume["erv_airvolume"],
+                "fau_reserve_time": reserve_time["fau_reserve_time"],
+                "erv_reserve_time": reserve_time["erv_reserve_time"],
+            },
+            "userid": self.coordinator.user_id,
+        }
+        _response = self.coordinator.request("/device/command", body)
+        self.commands += 1
+        self.reserve_until = reserve_until
+        self.coordinator.air_quality.invalidate_enrichment(self.idx)
+        # only list-redis fields go into the snapshot, as the device reports them
+        self.coordinator.apply_command(
+            self.idx,
+            {
+                key: air_volume.get(key, value)
+                for key, value in changes.items()
+                if key in status
+            },
+        )
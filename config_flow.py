@@ -1,21 +1,70 @@
 """Config flow for xi_home integration."""
 from __future__ import annotations
 
+import asyncio
+from collections import Counter
 import logging
+import time
 from typing import Any
 
+import async_timeout
+import requests
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN
+from .api import auth_body, list_body
+from .const import (
+    CONF_AIR_QUALITY_INTERVAL,
+    CONF_AIR_QUALITY_TIMEOUT,
+    CONF_CO2_DEADBAND,
+    CONF_COMMAND_TIMEOUT,
+    CONF_ENRICH_CONCURRENCY,
+    CONF_ENRICH_TTL,
+    CONF_FORCE_WRITE_INTERVAL,
+    CONF_LIST_TIMEOUT,
+    CONF_LOCAL_HOST,
+    CONF_MIN_WRITE_INTERVAL,
+    CONF_PM25_DEADBAND,
+    CONF_POLL_TIMEOUT,
+    CONF_PUSH_URL,
+    CONF_RATE_LIMIT,
+    CONF_RETRY,
+    CONF_SCAN_INTERVAL,
+    CONF_STATUS_TIMEOUT,
+    CONF_TEMPERATURE_DEADBAND,
+    DATA_HANDOFF,
+    DEFAULT_OPTIONS,
+    DOMAIN,
+    VALIDATE_TIMEOUT,
+)
 from .helper import request_data
 
 _LOGGER = logging.getLogger(__name__)
 
+# integer options and their minimum value
+INT_OPTIONS = [
+    (CONF_SCAN_INTERVAL, 10),
+    (CONF_POLL_TIMEOUT, 1),
+    (CONF_AIR_QUALITY_INTERVAL, 30),
+    (CONF_AIR_QUALITY_TIMEOUT, 1),
+    (CONF_LIST_TIMEOUT, 1),
+    (CONF_STATUS_TIMEOUT, 1),
+    (CONF_COMMAND_TIMEOUT, 1),
+    (CONF_RETRY, 0),
+    (CONF_ENRICH_CONCURRENCY, 1),
+    (CONF_ENRICH_TTL, 0),
+    (CONF_RATE_LIMIT, 0),
+    (CONF_PM25_DEADBAND, 0),
+    (CONF_CO2_DEADBAND, 0),
+    (CONF_TEMPERATURE_DEADBAND, 0),
+    (CONF_MIN_WRITE_INTERVAL, 0),
+    (CONF_FORCE_WRITE_INTERVAL, 0),
+]
+
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required("token"): str,
@@ -28,26 +77,45 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     """Validate the user input allows us to connect.
 
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
+    Returns the session id and device list, so setup does not fetch them again.
     """
-
-    if not await hass.async_add_executor_job(
-        validate_token, data["username"], data["token"]
-    ):
+    try:
+        async with async_timeout.timeout(2 * VALIDATE_TIMEOUT):
+            return await hass.async_add_executor_job(
+                discover, data["username"], data["token"]
+            )
+    except (asyncio.TimeoutError, requests.RequestException, ValueError) as err:
+        raise CannotConnect from err
+
+
+def discover(user_id, token):
+    """Log in and list the devices, without retries."""
+    response = request_data(
+        "/auth/user", token, auth_body(user_id), timeout=VALIDATE_TIMEOUT, retry=0
+    )
+    if response["result"] != 0:
         raise InvalidAuth
-
-    # If you cannot connect:
-    # throw CannotConnect
-    # If the authentication is wrong:
-    # InvalidAuth
-
-    # Return info that you want to store in the config entry.
-    return {"title": "Name of the device"}
-
-
-def validate_token(user_id, token):
-    body = {"userid": user_id}
-    response = request_data("/auth/user", token, body)
-    return response["result"] == 0
+    body = list_body(response["sessionid"], user_id)
+    devices = request_data(
+        "/device/list-redis", token, body, timeout=VALIDATE_TIMEOUT, retry=0
+    )
+    return {"session_id": response["sessionid"], "devices": devices}
+
+
+def describe(devices):
+    """Return the rooms and device counts of a device list, for the preview."""
+    per_room = Counter(device["group"] for device in devices["devices"])
+    per_type = Counter(device["type"] for device in devices["devices"])
+    return {
+        "rooms": ", ".join(
+            "{} ({})".format(room["name"], per_room[room["name"]])
+            for room in devices["groups"]
+        ),
+        "devices": ", ".join(
+            "{} {}".format(count, device_type)
+            for device_type, count in per_type.most_common()
+        ),
+    }
 
 
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -55,6 +123,11 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Initialize the config flow."""
+        self._user_input: dict[str, Any] = {}
+        self._discovery: dict[str, Any] = {}
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -71,12 +144,66 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 _LOGGER.exception("Unexpected exception")
                 errors["base"] = "unknown"
             else:
-                return self.async_create_entry(title=info["title"], data=user_input)
+                self._user_input = user_input
+                self._discovery = info
+                return await self.async_step_confirm()
 
         return self.async_show_form(
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
 
+    async def async_step_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Show the discovered rooms and devices before creating the entry."""
+        if user_input is not None:
+            # hand the session and device list to async_setup_entry
+            self.hass.data.setdefault(DATA_HANDOFF, {})[
+                self._user_input["username"]
+            ] = {**self._discovery, "time": time.monotonic()}
+            return self.async_create_entry(
+                title=self._user_input["username"], data=self._user_input
+            )
+
+        return self.async_show_form(
+            step_id="confirm",
+            description_placeholders=describe(self._discovery["devices"]),
+        )
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Create the options flow."""
+        return OptionsFlowHandler(config_entry)
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle xi_home options."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize options flow."""
+        self._config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = {**DEFAULT_OPTIONS, **self._config_entry.options}
+        schema = {
+            vol.Required(key, default=options[key]): vol.All(
+                vol.Coerce(int), vol.Range(min=minimum)
+            )
+            for key, minimum in INT_OPTIONS
+        }
+        schema[vol.Optional(CONF_PUSH_URL, default=options[CONF_PUSH_URL])] = str
+        schema[vol.Optional(CONF_LOCAL_HOST, default=options[CONF_LOCAL_HOST])] = str
+        return self.async_show_form(step_id="init", data_schema=vol.Schema(schema))
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
@@ -5,3 +5,96 @@ API_PREFIX = "https://smartcareback.twinspace.co.kr:20001"
 
 TIMEOUT = 5
 RETRY = 5
+
+# endpoints that only read data; identical concurrent requests are shared
+READ_PATHS = {"/auth/user", "/device/list-redis", "/device/status"}
+
+# number of air quality polls kept in the in-memory history (2 hours at the
+# default 120 second air_quality_interval)
+HISTORY_SIZE = 60
+ACS_HISTORY_FIELDS = ["dust_value", "co2_value", "smell_value"]
+
+# long-term history of readings, kept in this directory under the config dir
+STORE_DIRECTORY = "xi_home_history"
+HEATING_STORE_FIELDS = ["curtemp", "settemp"]
+# hours between downsampling and retention runs of the store
+STORE_COMPACT_INTERVAL = 1
+
+CONF_PM25_DEADBAND = "pm25_deadband"
+CONF_CO2_DEADBAND = "co2_deadband"
+CONF_TEMPERATURE_DEADBAND = "temperature_deadband"
+CONF_MIN_WRITE_INTERVAL = "min_write_interval"
+CONF_FORCE_WRITE_INTERVAL = "force_write_interval"
+CONF_PUSH_URL = "push_url"
+CONF_SCAN_INTERVAL = "scan_interval"
+CONF_POLL_TIMEOUT = "poll_timeout"
+CONF_LIST_TIMEOUT = "list_timeout"
+CONF_STATUS_TIMEOUT = "status_timeout"
+CONF_COMMAND_TIMEOUT = "command_timeout"
+CONF_RETRY = "retry"
+CONF_ENRICH_CONCURRENCY = "enrich_concurrency"
+CONF_RATE_LIMIT = "rate_limit"
+CONF_ENRICH_TTL = "enrich_ttl"
+CONF_AIR_QUALITY_INTERVAL = "air_quality_interval"
+CONF_AIR_QUALITY_TIMEOUT = "air_quality_timeout"
+CONF_LOCAL_HOST = "local_host"
+
+DEFAULT_OPTIONS = {
+    CONF_PM25_DEADBAND: 2,
+    CONF_CO2_DEADBAND: 25,
+    CONF_TEMPERATURE_DEADBAND: 1,
+    # seconds
+    CONF_MIN_WRITE_INTERVAL: 0,
+    CONF_FORCE_WRITE_INTERVAL: 3600,
+    # websocket url of the push channel, empty to only poll
+    CONF_PUSH_URL: "",
+    # wallpad "host" or "host:port" on the LAN, empty to only use the cloud
+    CONF_LOCAL_HOST: "",
+    # seconds
+    CONF_SCAN_INTERVAL: 60,
+    CONF_POLL_TIMEOUT: 10,
+    CONF_AIR_QUALITY_INTERVAL: 120,
+    CONF_AIR_QUALITY_TIMEOUT: 20,
+    CONF_LIST_TIMEOUT: TIMEOUT,
+    CONF_STATUS_TIMEOUT: TIMEOUT,
+    CONF_COMMAND_TIMEOUT: TIMEOUT,
+    CONF_RETRY: RETRY,
+    # parallel /device/status requests per poll
+    CONF_ENRICH_CONCURRENCY: 1,
+    # seconds /device/status results are reused while list-redis is unchanged
+    CONF_ENRICH_TTL: 600,
+    # requests per minute, 0 for no limit
+    CONF_RATE_LIMIT: 0,
+}
+
+# option holding the request timeout of each endpoint
+ENDPOINT_TIMEOUTS = {
+    "/auth/user": CONF_LIST_TIMEOUT,
+    "/public": CONF_LIST_TIMEOUT,
+    "/device/list-redis": CONF_LIST_TIMEOUT,
+    "/device/status": CONF_STATUS_TIMEOUT,
+    "/device/command": CONF_COMMAND_TIMEOUT,
+    "/public/openlobby": CONF_COMMAND_TIMEOUT,
+}
+
+# seconds each config flow request may take; the flow never retries
+VALIDATE_TIMEOUT = 5
+# hass.data key of the sessions and device lists handed from the config
+# flow or an unloaded entry to setup, by username, and the seconds they
+# stay usable
+DATA_HANDOFF = DOMAIN + "_handoff"
+HANDOFF_TTL = 300
+
+# safety-net polling interval while the push channel is connected (minutes)
+PUSH_POLL_INTERVAL = 15
+
+# fired with the changed status fields of a device, {field: {"old", "new"}}
+EVENT_DEVICE_CHANGED = DOMAIN + "_device_changed"
+
+# dispatcher signal with the devices a poll found for the first time
+SIGNAL_DEVICES_ADDED = DOMAIN + "_devices_added"
+# dispatcher signal with the idx of devices whose registry entries were deleted
+SIGNAL_DEVICES_REMOVED = DOMAIN + "_devices_removed"
+# seconds a device must stay out of list-redis before its registry entries,
+# with their names, areas and disabled flags, are deleted
+DEVICE_REMOVE_DELAY = 3600
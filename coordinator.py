@@ -0,0 +1,315 @@
+"""Air quality and metadata coordinators for the xi_home integration."""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+import json
+import logging
+import time
+
+import async_timeout
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import update_coordinator
+from homeassistant.util import dt as dt_util
+
+from .aggregate import HOME_GROUP
+from .api import acs_unit_status, auth_body, command_body, lobby_doors_body, status_body
+from .const import (
+    ACS_HISTORY_FIELDS,
+    CONF_AIR_QUALITY_INTERVAL,
+    CONF_AIR_QUALITY_TIMEOUT,
+    CONF_ENRICH_CONCURRENCY,
+    CONF_ENRICH_TTL,
+    HISTORY_SIZE,
+)
+from .history import RollingWindow
+from .snapshot import freeze
+
+_LOGGER = logging.getLogger(__name__)
+
+# fields /device/status returns for an acs device
+ACS_STATUS_FIELDS = ["dust_value", "co2_value", "smell_value", "dust_unit"]
+# seconds a cycle may overrun its time budget before it is abandoned
+POLL_GRACE = 5
+
+METADATA_INTERVAL = timedelta(hours=12)
+METADATA_TIMEOUT = 30
+
+
+class MetadataCoordinator(update_coordinator.DataUpdateCoordinator):
+    """Near-static account data: the session id and the lobby doors."""
+
+    def __init__(self, hass: HomeAssistant, hub) -> None:
+        """Initialize a MetadataCoordinator for the device-state coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="xi_home metadata",
+            update_interval=METADATA_INTERVAL,
+        )
+        self.hub = hub
+
+    async def _async_update_data(self):
+        """Fetch the session id and lobby doors."""
+        async with async_timeout.timeout(METADATA_TIMEOUT):
+            return await self.hass.async_add_executor_job(self.get_metadata)
+
+    def get_metadata(self):
+        """Get the session id and lobby doors from xi_home.
+
+        A session id and lobby doors handed over from the config flow or
+        the previous setup are kept on the first refresh.
+        """
+        session_id = self.hub.session_id
+        lobby_doors = self.hub.lobby_door_data
+        if self.data is not None or session_id is None:
+            session_id = self.get_xi_home_session_id()
+        if self.data is not None or lobby_doors is None:
+            lobby_doors = self.get_lobby_door_data()
+        return {"session_id": session_id, "lobby_doors": lobby_doors}
+
+    def get_lobby_door_data(self):
+        """Get lobby door data from xi_home."""
+        response = self.hub.request("/public", lobby_doors_body(self.hub.user_id))
+        return response["data"]["list"]
+
+    def get_xi_home_session_id(self):
+        """Get session id from xi_home."""
+        response = self.hub.request("/auth/user", auth_body(self.hub.user_id))
+        return response["sessionid"]
+
+
+class AirQualityCoordinator(update_coordinator.DataUpdateCoordinator):
+    """Air quality readings of the acs devices, fetched from /device/status.
+
+    The acs devices come from the device-state coordinator. Each cycle
+    runs against its own time budget; readings that miss it keep their
+    previous values and freshness time. Devices without an enabled entity
+    listening are not fetched at all.
+    """
+
+    def __init__(self, hass: HomeAssistant, hub) -> None:
+        """Initialize an AirQualityCoordinator for the device-state coordinator."""
+        super().__init__(
+            hass,
+            _LOGGER,
+            name="xi_home air quality",
+            update_interval=timedelta(minutes=2),
+        )
+        self.hub = hub
+        self.acs_history: dict[int, dict[str, RollingWindow]] = {}
+        self.changed_groups: set[str] = set()
+        # idx -> (monotonic fetch time, list-redis status, values)
+        self.enrich_cache: dict[int, tuple] = {}
+        self.enrich_hits = 0
+        self.enrich_misses = 0
+        self.skipped = 0
+        # readings of the previous setup, until the first refresh
+        self._seed_devices: dict = {}
+
+    def apply_options(self, options):
+        """Apply the air quality polling interval."""
+        self.update_interval = timedelta(seconds=options[CONF_AIR_QUALITY_INTERVAL])
+
+    def seed(self, devices, enrich_cache, acs_history):
+        """Start from the readings, cache and history of the previous setup.
+
+        Readings whose cache entry is still valid are not fetched again on
+        the first refresh.
+        """
+        self._seed_devices = dict(devices)
+        self.enrich_cache = dict(enrich_cache)
+        self.acs_history = acs_history
+
+    async def _async_update_data(self):
+        """Fetch the air quality of every acs device."""
+        budget = self.hub.options[CONF_AIR_QUALITY_TIMEOUT]
+        with self.hub.span("air quality cycle"):
+            wanted = self.wanted_devices()
+            async with async_timeout.timeout(budget + POLL_GRACE):
+                data = freeze(
+                    await self.hass.async_add_executor_job(
+                        self.get_air_quality_data, wanted
+                    )
+                )
+            with self.hub.span("acs history"):
+                self.forget_removed_devices()
+                self.update_acs_history(data)
+            with self.hub.span("aggregates"):
+                self.update_aggregates(data)
+        return data
+
+    @callback
+    def wanted_devices(self) -> set[int] | None:
+        """Return the acs devices some enabled entity needs, None for all.
+
+        Sensors listen with their device idx as context and aggregates
+        with their group. Disabled entities never listen. Until the
+        entities are set up every device is wanted.
+        """
+        if not self._listeners:
+            return None
+        contexts = set(self.async_contexts())
+        if HOME_GROUP in contexts:
+            return None
+        return {
+            idx
+            for idx, device in self.hub.data["indexed_devices"].items()
+            if idx in contexts or device["group"] in contexts
+        }
+
+    def update_acs_history(self, data):
+        """Push the latest acs readings into the per-device history."""
+        for idx, values in data["devices"].items():
+            if values["fetched_at"] != data["fetched_at"]:
+                # stale values carried over from an earlier poll
+                continue
+            history = self.acs_history.setdefault(
+                idx,
+                {field: RollingWindow(HISTORY_SIZE) for field in ACS_HISTORY_FIELDS},
+            )
+            for field, window in history.items():
+                window.push(int(values[field]))
+
+    def update_aggregates(self, data):
+        """Feed the readings that changed into the room aggregates."""
+        previous = self.data["devices"] if self.data else {}
+        indexed = self.hub.data["indexed_devices"]
+        self.changed_groups = self.hub.aggregates.update(
+            {
+                "idx": idx,
+                "group": indexed[idx]["group"],
+                "type": "acs",
+                "status": values,
+            }
+            for idx, values in data["devices"].items()
+            if idx in indexed
+            and (idx not in previous or previous[idx] != values)
+        )
+        for idx in previous.keys() - data["devices"].keys():
+            self.changed_groups |= self.hub.aggregates.remove(idx)
+
+    def get_air_quality_data(self, wanted=None):
+        """Fetch the air quality of the wanted acs devices within the time budget.
+
+        Requests that have not finished by the deadline are cancelled.
+        """
+        deadline = time.monotonic() + self.hub.options[CONF_AIR_QUALITY_TIMEOUT]
+        now = dt_util.utcnow()
+        previous = self.data["devices"] if self.data else self._seed_devices
+        self._seed_devices = {}
+        devices = {}
+        pending = []
+        signatures = {}
+        for idx, device in self.hub.data["indexed_devices"].items():
+            if device["type"] != "acs" or not device["status"]:
+                continue
+            if wanted is not None and idx not in wanted:
+                self.skipped += 1
+                continue
+            signature = json.dumps(dict(device["status"]), sort_keys=True)
+            cached = self.cached_enrichment(idx, signature, previous)
+            if cached is not None:
+                devices[idx] = {**cached, "fetched_at": previous[idx]["fetched_at"]}
+            else:
+                signatures[idx] = signature
+                pending.append(device)
+        data = {"fetched_at": now, "devices": devices}
+        if not pending:
+            return data
+
+        concurrency = min(self.hub.options[CONF_ENRICH_CONCURRENCY], len(pending))
+        pool = ThreadPoolExecutor(max_workers=concurrency)
+        futures = {
+            pool.submit(self.get_enriched_acs_data, device, deadline): device
+            for device in pending
+        }
+        with self.hub.span("acs loop"):
+            wait(futures, timeout=max(deadline - time.monotonic(), 0))
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        fresh = []
+        for future, device in futures.items():
+            idx = device["idx"]
+            if future.done() and not future.cancelled() and not future.exception():
+                values = future.result()
+                devices[idx] = {**values, "fetched_at": now}
+                self.enrich_cache[idx] = (time.monotonic(), signatures[idx], values)
+                fresh.append((idx, values))
+                continue
+            if future.done() and not future.cancelled():
+                _LOGGER.debug(
+                    "Enriching %s failed: %s", device["device_id"], future.exception()
+                )
+            else:
+                _LOGGER.debug(
+                    "Enriching %s missed the poll budget", device["device_id"]
+                )
+            if idx in previous:
+                devices[idx] = previous[idx]
+
+        timestamp = now.timestamp()
+        self.hub.record_history(
+            ("{}.{}".format(idx, field), timestamp, float(values[field]))
+            for idx, values in fresh
+            for field in ACS_HISTORY_FIELDS
+        )
+        return data
+
+    def forget_removed_devices(self):
+        """Drop the cache and history of acs devices no longer listed."""
+        indexed = self.hub.data["indexed_devices"]
+        for idx in self.enrich_cache.keys() - indexed.keys():
+            del self.enrich_cache[idx]
+        for idx in self.acs_history.keys() - indexed.keys():
+            del self.acs_history[idx]
+
+    def cached_enrichment(self, idx, signature, previous):
+        """Return the cached air quality values of an acs device if still valid.
+
+        The cache holds for the enrichment TTL as long as the device's
+        list-redis status stays the same, no command was sent to it and
+        its readings are in `previous`.
+        """
+        ttl = self.hub.options[CONF_ENRICH_TTL]
+        cached = self.enrich_cache.get(idx)
+        if (
+            not ttl
+            or cached is None
+            or cached[1] != signature
+            or time.monotonic() - cached[0] >= ttl
+            or idx not in previous
+        ):
+            self.enrich_misses += 1
+            return None
+        self.enrich_hits += 1
+        return cached[2]
+
+    def invalidate_enrichment(self, idx):
+        """Make the next poll fetch /device/status for this device again."""
+        self.enrich_cache.pop(idx, None)
+
+    def get_enriched_acs_data(self, device, deadline=None):
+        """Return the air quality values of an acs device from /device/status."""
+        # acs data from list-redis api is not correct
+        device_id = device["device_id"]
+        group_id = device["groupID"]
+        acs_data = self.get_acs_data(device_id, group_id, deadline)
+        if acs_data["dust_unit"] != "PM2.5":
+            self.acs_change_unit(device_id, group_id, "PM2.5", deadline)
+            acs_data = self.get_acs_data(device_id, group_id, deadline)
+        return {field: acs_data[field] for field in ACS_STATUS_FIELDS}
+
+    def acs_change_unit(self, device_id, group_id, unit, deadline=None):
+        """Chance unit of acs device."""
+        body = command_body(
+            device_id, group_id, "acs", acs_unit_status(unit), self.hub.user_id
+        )
+        _response = self.hub.request("/device/command", body, deadline=deadline)
+
+    def get_acs_data(self, device_id, group_id, deadline=None):
+        """Get acs data from xi_home."""
+        body = status_body(device_id, group_id, "acs", self.hub.user_id)
+        response = self.hub.request("/device/status", body, deadline=deadline)
+        return response["status"]
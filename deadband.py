@@ -0,0 +1,46 @@
+"""Deadband filtering of sensor state writes."""
+from __future__ import annotations
+
+import time
+
+
+class WriteFilter:
+    """Decide whether a new reading is worth writing to the state machine.
+
+    A reading is written when it moved at least `deadband` away from the
+    last written value and `min_interval` seconds passed since the last
+    write, or when nothing was written for `force_interval` seconds.
+    """
+
+    def __init__(
+        self, deadband: float, min_interval: float, force_interval: float
+    ) -> None:
+        """Initialize a WriteFilter."""
+        self.deadband = deadband
+        self.min_interval = min_interval
+        self.force_interval = force_interval
+        self.suppressed = 0
+        self._last_value = None
+        self._last_write = None
+
+    def should_write(self, value: float) -> bool:
+        """Return True and remember the value if it should be written."""
+        now = time.monotonic()
+        if self._last_write is None or self._passes(value, now):
+            self.record(value, now)
+            return True
+        self.suppressed += 1
+        return False
+
+    def record(self, value: float, now: float | None = None) -> None:
+        """Remember a value that was written for another reason."""
+        self._last_value = value
+        self._last_write = time.monotonic() if now is None else now
+
+    def _passes(self, value: float, now: float) -> bool:
+        elapsed = now - self._last_write
+        if self.force_interval and elapsed >= self.force_interval:
+            return True
+        if elapsed < self.min_interval:
+            return False
+        return abs(value - self._last_value) >= self.deadband
@@ -0,0 +1,117 @@
+"""Device triggers for xi_home, on the status changes of the devices of a room."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components.device_automation import DEVICE_TRIGGER_BASE_SCHEMA
+from homeassistant.const import (
+    CONF_DEVICE_ID,
+    CONF_DOMAIN,
+    CONF_PLATFORM,
+    CONF_TYPE,
+)
+from homeassistant.core import CALLBACK_TYPE, HassJob, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.trigger import TriggerActionType, TriggerInfo
+from homeassistant.helpers.typing import ConfigType
+
+from .aggregate import HOME_GROUP
+from .const import DOMAIN, EVENT_DEVICE_CHANGED
+
+CONF_SUBTYPE = "subtype"
+CONF_FIELD = "field"
+TRIGGER_STATUS_CHANGED = "status_changed"
+
+TRIGGER_SCHEMA = DEVICE_TRIGGER_BASE_SCHEMA.extend(
+    {
+        vol.Required(CONF_TYPE): vol.In([TRIGGER_STATUS_CHANGED]),
+        vol.Required(CONF_SUBTYPE): str,
+        vol.Optional(CONF_FIELD): str,
+    }
+)
+
+
+def room_devices(hass: HomeAssistant, device_id: str) -> list:
+    """Return the xi_home devices of the room behind a device registry id."""
+    coordinator = hass.data.get(DOMAIN)
+    device = dr.async_get(hass).async_get(device_id)
+    if coordinator is None or coordinator.data is None or device is None:
+        return []
+    group = next(
+        (identifier for domain, identifier in device.identifiers if domain == DOMAIN),
+        None,
+    )
+    return [
+        xi_device
+        for xi_device in coordinator.data["devices"]
+        if group == HOME_GROUP or xi_device["group"] == group
+    ]
+
+
+async def async_get_triggers(
+    hass: HomeAssistant, device_id: str
+) -> list[dict[str, Any]]:
+    """List a status trigger for each xi_home device in the room."""
+    return [
+        {
+            CONF_PLATFORM: "device",
+            CONF_DOMAIN: DOMAIN,
+            CONF_DEVICE_ID: device_id,
+            CONF_TYPE: TRIGGER_STATUS_CHANGED,
+            CONF_SUBTYPE: xi_device["device_id"],
+        }
+        for xi_device in room_devices(hass, device_id)
+    ]
+
+
+async def async_get_trigger_capabilities(
+    hass: HomeAssistant, config: ConfigType
+) -> dict[str, vol.Schema]:
+    """Offer the status fields of the device to narrow the trigger to one."""
+    fields = next(
+        (
+            sorted(xi_device["status"])
+            for xi_device in room_devices(hass, config[CONF_DEVICE_ID])
+            if xi_device["device_id"] == config[CONF_SUBTYPE]
+        ),
+        [],
+    )
+    if not fields:
+        return {}
+    return {"extra_fields": vol.Schema({vol.Optional(CONF_FIELD): vol.In(fields)})}
+
+
+async def async_attach_trigger(
+    hass: HomeAssistant,
+    config: ConfigType,
+    action: TriggerActionType,
+    trigger_info: TriggerInfo,
+) -> CALLBACK_TYPE:
+    """Listen for the device changed events of one device."""
+    xi_device_id = config[CONF_SUBTYPE]
+    field = config.get(CONF_FIELD)
+    trigger_data = trigger_info["trigger_data"]
+    job = HassJob(action)
+
+    @callback
+    def handle_event(event) -> None:
+        if event.data["device"] != xi_device_id:
+            return
+        if field is not None and field not in event.data["changes"]:
+            return
+        hass.async_run_hass_job(
+            job,
+            {
+                "trigger": {
+                    **trigger_data,
+                    **config,
+                    "description": "{} status changed".format(xi_device_id),
+                    "event": event,
+                }
+            },
+            event.context,
+        )
+
+    return hass.bus.async_listen(EVENT_DEVICE_CHANGED, handle_event)
@@ -0,0 +1,58 @@
+"""Diagnostics support for xi_home."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_PUSH_URL, DOMAIN
+from .helper import single_flight
+
+# the push url may carry a token
+TO_REDACT = {"token", "username", CONF_PUSH_URL}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = hass.data[DOMAIN]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "options": async_redact_data(coordinator.options, TO_REDACT),
+        "single_flight": {
+            "calls": single_flight.calls,
+            "shared": single_flight.shared,
+        },
+        "acs_enrichment": {
+            "cache_hits": coordinator.air_quality.enrich_hits,
+            "cache_misses": coordinator.air_quality.enrich_misses,
+            "skipped_disabled": coordinator.air_quality.skipped,
+        },
+        "last_update_success": {
+            "device_state": coordinator.last_update_success,
+            "air_quality": coordinator.air_quality.last_update_success,
+            "metadata": coordinator.metadata.last_update_success,
+        },
+        "transport": {
+            "local_host": coordinator.local_host,
+            "local_requests": coordinator.local_requests,
+            "local_fallbacks": coordinator.local_fallbacks,
+        },
+        "push": {
+            "connected": coordinator.push_connected,
+            "messages": coordinator.push.messages if coordinator.push else 0,
+        },
+        "acs_commands": {
+            idx: {"commands": merger.commands, "merged": merger.merged}
+            for idx, merger in coordinator.acs_mergers.items()
+        },
+        "history_store": {
+            "samples_appended": coordinator.store.appended if coordinator.store else 0,
+        },
+        "suppressed_writes": sum(
+            write_filter.suppressed for write_filter in coordinator.write_filters
+        ),
+    }
@@ -1,17 +1,23 @@
 """Platform for fan integration."""
 from __future__ import annotations
 
+import math
 from typing import Any, Optional
+
+import voluptuous as vol
+
 from homeassistant.components.fan import FanEntityFeature, FanEntity
 
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers import entity_platform
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util.percentage import percentage_to_ranged_value
 
-from .const import DOMAIN
-from .helper import request_data
+from .const import DOMAIN, SIGNAL_DEVICES_ADDED
 
 # erv
 VENTILATION_OFF = "Ventilation Off"
@@ -34,6 +40,13 @@ COMMAND_VALUES = {
     VENTILATION_SLEEP: [1, 0, "sleep"],
 }
 
+SERVICE_SET_TIMER = "set_timer"
+
+
+def air_volume(percentage: int, speed_count: int) -> int:
+    """Return the whole air volume level for a speed percentage."""
+    return math.ceil(percentage_to_ranged_value((1, speed_count), percentage))
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -42,13 +55,28 @@ async def async_setup_entry(
 ) -> None:
     """Setup heating systems"""
     coordinator = hass.data[DOMAIN]
-    entities = []
-    for device in coordinator.data["devices"]:
-        if device["type"] == "acs":
-            entities.append(XiHomeVentilationSystem(device, coordinator))
-            entities.append(XiHomeFreshAirUnit(device, coordinator))
 
-    async_add_entities(entities)
+    @callback
+    def async_add_devices(devices) -> None:
+        entities = []
+        for device in devices:
+            if device["type"] == "acs":
+                entities.append(XiHomeVentilationSystem(device, coordinator))
+                entities.append(XiHomeFreshAirUnit(device, coordinator))
+        coordinator.track_entities(entities)
+        async_add_entities(entities)
+
+    async_add_devices(coordinator.data["devices"])
+    config_entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_DEVICES_ADDED, async_add_devices)
+    )
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_SET_TIMER,
+        {vol.Required("hours"): vol.All(vol.Coerce(int), vol.Range(min=0, max=12))},
+        "set_timer",
+    )
 
 
 class XiHomeVentilationSystem(CoordinatorEntity, FanEntity):
@@ -64,67 +92,26 @@ class XiHomeVentilationSystem(CoordinatorEntity, FanEntity):
         self._group = device_data["group"]
         self._state = 0
         self._type = device_data["type"]
-        self._name = "{} Ventilation".format(device_data["group"])
+        self._attr_name = "{} Ventilation".format(device_data["group"])
         self._device_id = device_data["device_id"]
+        self._attr_unique_id = self._device_id + str(self.idx) + "_erv"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, self._group)})
+        self._merger = coordinator.acs_merger(device_data)
 
         self._current_speed = 0
-        self._speed_count = 3
+        self._attr_speed_count = 3
         self._mode = ""
 
-        self._supported_features = (
+        self._attr_supported_features = (
             FanEntityFeature.PRESET_MODE | FanEntityFeature.SET_SPEED
         )
-        self._preset_modes = ["auto", "sleep"]
+        self._attr_preset_modes = ["auto", "sleep"]
         self.set_state_from_status_data(device_data["status"])
 
     @property
-    def name(self) -> str:
-        """Return the display name of this fan."""
-        return self._name
-
-    @property
-    def is_on(self) -> bool | None:
-        """Return true if fan is on."""
-        return bool(self._state)
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique, Home Assistant friendly identifier for this entity."""
-        return self._device_id + str(self.idx) + "_erv"
-
-    @property
-    def preset_modes(self):
-        """Return preset modes."""
-        return self._preset_modes
-
-    @property
-    def preset_mode(self):
-        """Return preset modes."""
-        if self._mode in self._preset_modes:
-            return self._mode
-        return None
-
-    @property
-    def percentage(self) -> int:
-        """Return the current speed percentage."""
-        return int(self._current_speed / self._speed_count * 100)
-
-    @property
-    def speed_count(self) -> int:
-        """Return the number of speeds the fan supports."""
-        return self._speed_count
-
-    @property
-    def supported_features(self):
-        """Return supported features."""
-        return self._supported_features
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._group)},
-        )
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the minutes left before the device switches itself off."""
+        return {"timer_remaining": self._merger.reserve_remaining("erv")}
 
     def set_state_from_status_data(self, status):
         """Get status from data."""
@@ -133,6 +120,15 @@ class XiHomeVentilationSystem(CoordinatorEntity, FanEntity):
         self._state = status["erv_runstate"]
         self._current_speed = int(status["erv_airvolume"])
         self._mode = status["erv_mode"]
+        self._update_attributes()
+
+    def _update_attributes(self) -> None:
+        """Derive the entity attributes from the device state."""
+        self._attr_is_on = bool(self._state)
+        self._attr_percentage = int(self._current_speed / self._attr_speed_count * 100)
+        self._attr_preset_mode = (
+            self._mode if self._mode in self._attr_preset_modes else None
+        )
 
     def set_preset_mode(self, preset_mode: str) -> None:
         """Set the preset mode of the fan."""
@@ -150,45 +146,32 @@ class XiHomeVentilationSystem(CoordinatorEntity, FanEntity):
         """Set the speed percentage of the fan."""
         if percentage == 0:
             self.turn_off()
+            return
         self._state = 1
-        self._current_speed = percentage / 100 * self._speed_count
+        self._current_speed = air_volume(percentage, self._attr_speed_count)
         self._mode = "manual"
         self.send_command()
 
-    def send_command(self):
+    def send_command(self, **extra: Any):
         """Send command by api"""
-        data = self.coordinator.data["indexed_devices"][self.idx]["status"]
-        body = {
-            "device_id": self._device_id,
-            "type": self._type,
-            "groupId": self._group_id,
-            "status": {
-                "fau_runstate": data["fau_runstate"],
+        self._merger.send(
+            {
                 "erv_runstate": self._state,
-                "fau_mode": data["fau_mode"],
                 "erv_mode": self._mode,
-                "fau_air_volume": int(data["fau_airvolume"]),
-                "erv_air_volume": self._current_speed,
-                "fau_reserve_time": 0,
-                "erv_reserve_time": 0,
-            },
-            "userid": self.coordinator.user_id,
-        }
-        _response = request_data("/device/command", self.coordinator.token, body)
-        self.update_coordinator_data()
+                "erv_airvolume": self._current_speed,
+                **extra,
+            }
+        )
+        self._update_attributes()
         self.schedule_update_ha_state()
 
-    def update_coordinator_data(self):
-        """Update data from coordinator."""
-        self.coordinator.data["indexed_devices"][self.idx]["status"][
-            "erv_runstate"
-        ] = self._state
-        self.coordinator.data["indexed_devices"][self.idx]["status"][
-            "erv_mode"
-        ] = self._mode
-        self.coordinator.data["indexed_devices"][self.idx]["status"][
-            "erv_airvolume"
-        ] = self._current_speed
+    def set_timer(self, hours: int) -> None:
+        """Run for `hours` and let the device switch itself off."""
+        if hours and not self._state:
+            self._state = 1
+            self._current_speed = 1
+            self._mode = "manual"
+        self.send_command(erv_reserve_time=hours)
 
     def turn_on(
         self,
@@ -203,8 +186,7 @@ class XiHomeVentilationSystem(CoordinatorEntity, FanEntity):
         if percentage is None:
             self._current_speed = 1
         else:
-            self._current_speed = percentage / 100 * self._speed_count
-        self._state = 1
+            self._current_speed = air_volume(percentage, self._attr_speed_count)
         self._state = 1
         self._mode = "manual"
         self.send_command()
@@ -237,75 +219,44 @@ class XiHomeFreshAirUnit(CoordinatorEntity, FanEntity):
         self._group = device_data["group"]
         self._state = 0
         self._type = device_data["type"]
-        self._name = "{} Fresh Air Unit".format(device_data["group"])
+        self._attr_name = "{} Fresh Air Unit".format(device_data["group"])
         self._device_id = device_data["device_id"]
+        self._attr_unique_id = self._device_id + str(self.idx) + "_fau"
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, self._group)})
+        self._merger = coordinator.acs_merger(device_data)
 
         self._current_speed = 0
-        self._speed_count = 3
+        self._attr_speed_count = 3
         self._mode = ""
 
-        self._supported_features = (
+        self._attr_supported_features = (
             FanEntityFeature.PRESET_MODE | FanEntityFeature.SET_SPEED
         )
-        self._preset_modes = ["auto", "sleep", "boost"]
+        self._attr_preset_modes = ["auto", "sleep", "boost"]
         self.set_state_from_status_data(device_data["status"])
 
     @property
-    def name(self) -> str:
-        """Return the display name of this fan."""
-        return self._name
-
-    @property
-    def is_on(self) -> bool | None:
-        """Return true if fan is on."""
-        return bool(self._state)
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique, Home Assistant friendly identifier for this entity."""
-        return self._device_id + str(self.idx) + "_fau"
-
-    @property
-    def preset_modes(self):
-        """Return preset modes."""
-        return self._preset_modes
-
-    @property
-    def preset_mode(self):
-        """Return preset modes."""
-        if self._mode in self._preset_modes:
-            return self._mode
-        if self._current_speed == 4:
-            return "boost"
-        return None
-
-    @property
-    def percentage(self) -> int:
-        """Return the current speed percentage."""
-        return int(self._current_speed / self._speed_count * 100)
-
-    @property
-    def speed_count(self) -> int:
-        """Return the number of speeds the fan supports."""
-        return self._speed_count
-
-    @property
-    def supported_features(self):
-        """Return supported features."""
-        return self._supported_features
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._group)},
-        )
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the minutes left before the device switches itself off."""
+        return {"timer_remaining": self._merger.reserve_remaining("fau")}
 
     def set_state_from_status_data(self, status):
         """Set status from data."""
         self._state = status["fau_runstate"]
         self._current_speed = int(status["fau_airvolume"])
         self._mode = status["fau_mode"]
+        self._update_attributes()
+
+    def _update_attributes(self) -> None:
+        """Derive the entity attributes from the device state."""
+        self._attr_is_on = bool(self._state)
+        self._attr_percentage = int(self._current_speed / self._attr_speed_count * 100)
+        if self._mode in self._attr_preset_modes:
+            self._attr_preset_mode = self._mode
+        elif self._current_speed == 4:
+            self._attr_preset_mode = "boost"
+        else:
+            self._attr_preset_mode = None
 
     def set_preset_mode(self, preset_mode: str) -> None:
         """Set the preset mode of the fan."""
@@ -327,46 +278,32 @@ class XiHomeFreshAirUnit(CoordinatorEntity, FanEntity):
         """Set the speed percentage of the fan."""
         if percentage == 0:
             self.turn_off()
+            return
         self._state = 1
-        self._current_speed = percentage / 100 * self._speed_count
+        self._current_speed = air_volume(percentage, self._attr_speed_count)
         self._mode = "manual"
         self.send_command()
 
-    def send_command(self):
+    def send_command(self, **extra: Any):
         """Send command by api"""
-        data = self.coordinator.data["indexed_devices"][self.idx]["status"]
-        body = {
-            "device_id": self._device_id,
-            "type": self._type,
-            "groupId": self._group_id,
-            "status": {
+        self._merger.send(
+            {
                 "fau_runstate": self._state,
-                "erv_runstate": data["erv_runstate"],
                 "fau_mode": self._mode,
-                "erv_mode": data["erv_mode"],
-                "fau_air_volume": self._current_speed,
-                "erv_air_volume": int(data["erv_airvolume"]),
-                "fau_reserve_time": 0,
-                "erv_reserve_time": 0,
-            },
-            "userid": self.coordinator.user_id,
-        }
-
-        _response = request_data("/device/command", self.coordinator.token, body)
-        self.update_coordinator_data()
+                "fau_airvolume": self._current_speed,
+                **extra,
+            }
+        )
+        self._update_attributes()
         self.schedule_update_ha_state()
 
-    def update_coordinator_data(self):
-        """Update coordinator data"""
-        self.coordinator.data["indexed_devices"][self.idx]["status"][
-            "fau_runstate"
-        ] = self._state
-        self.coordinator.data["indexed_devices"][self.idx]["status"][
-            "fau_mode"
-        ] = self._mode
-        self.coordinator.data["indexed_devices"][self.idx]["status"][
-            "fau_airvolume"
-        ] = self._current_speed
+    def set_timer(self, hours: int) -> None:
+        """Run for `hours` and let the device switch itself off."""
+        if hours and not self._state:
+            self._state = 1
+            self._current_speed = 1
+            self._mode = "manual"
+        self.send_command(fau_reserve_time=hours)
 
     def turn_on(
         self,
@@ -381,7 +318,7 @@ class XiHomeFreshAirUnit(CoordinatorEntity, FanEntity):
         if percentage is None:
             self._current_speed = 1
         else:
-            self._current_speed = percentage / 100 * self._speed_count
+            self._current_speed = air_volume(percentage, self._attr_speed_count)
         self._state = 1
         self._mode = "manual"
         self.send_command()
@@ -1,7 +1,13 @@
+import copy
 import requests
 import json
+import threading
+import time
 from requests.adapters import HTTPAdapter, Retry
-from .const import TIMEOUT, RETRY, API_PREFIX
+from .const import TIMEOUT, RETRY, API_PREFIX, READ_PATHS
+
+# connections kept open per retry setting; matches the most parallel requests
+POOL_SIZE = 10
 
 
 def header(token: str) -> dict[str, str]:
@@ -21,7 +27,7 @@ def header(token: str) -> dict[str, str]:
     }
 
 
-def request_data(path, token, params):
+def request_data(path, token, params, profiler=None, timeout=TIMEOUT, retry=RETRY):
     """
     Sends a POST request to the API with the given path, token, and parameters.
 
@@ -29,23 +35,203 @@ def request_data(path, token, params):
         path (str): The path to send the request to.
         token (str): The authorization token to include in the request header.
         params (dict): The parameters to include in the request body.
+        profiler (PollProfiler, optional): Records the HTTP and JSON decoding time.
+        timeout (float, optional): The timeout of each attempt, in seconds.
+        retry (int, optional): The number of retries on server errors.
 
     Returns:
         dict: The JSON response from the API.
     """
     data = json.dumps(params)
-    url = API_PREFIX + path
-    s = requests.Session()
-    retries = Retry(
-        total=RETRY,
-        # 0s, 10s, 20s, 40s, 80s...
-        backoff_factor=5,
-        status_forcelist=[500, 502, 503, 504],
-        # allow retry on POST requests
-        allowed_methods=None,
+    if not is_read_request(path, params):
+        return _post(path, token, data, profiler, timeout, retry)
+
+    # calls with other time budgets are not shared, so a fail-fast caller
+    # never waits on a call that retries with backoff
+    return single_flight.do(
+        (path, token, data, timeout, retry),
+        lambda: _post(path, token, data, profiler, timeout, retry),
     )
 
-    s.mount(API_PREFIX, HTTPAdapter(max_retries=retries))
-    response = s.post(url, data=data, headers=header(token), timeout=TIMEOUT)
 
-    return response.json()
+def is_read_request(path, params):
+    """
+    Returns whether a request only reads data, so identical ones can be shared.
+
+    Args:
+        path (str): The path of the request.
+        params (dict): The parameters of the request body.
+
+    Returns:
+        bool: True for read requests.
+    """
+    if path == "/public":
+        return params.get("type") == "doorlock"
+    return path in READ_PATHS
+
+
+def _post(path, token, data, profiler, timeout, retry):
+    """
+    Sends one POST request and decodes the response. See request_data.
+    """
+    url = API_PREFIX + path
+    s = session(retry)
+    if profiler is None:
+        response = s.post(url, data=data, headers=header(token), timeout=timeout)
+        return response.json()
+
+    with profiler.span("http " + path):
+        response = s.post(url, data=data, headers=header(token), timeout=timeout)
+    with profiler.span("json " + path):
+        return response.json()
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def session(retry):
+    """
+    Returns the shared session for a retry setting, creating it on first use.
+
+    Sessions keep their connections alive between polls instead of opening
+    and leaking a new connection pool for every request.
+
+    Args:
+        retry (int): The number of retries on server errors.
+
+    Returns:
+        requests.Session: The session.
+    """
+    with _sessions_lock:
+        s = _sessions.get(retry)
+        if s is None:
+            retries = Retry(
+                total=retry,
+                # 0s, 10s, 20s, 40s, 80s...
+                backoff_factor=5,
+                status_forcelist=[500, 502, 503, 504],
+                # allow retry on POST requests
+                allowed_methods=None,
+            )
+            adapter = HTTPAdapter(max_retries=retries, pool_maxsize=POOL_SIZE)
+            s = _sessions[retry] = requests.Session()
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+        return s
+
+
+def close_sessions():
+    """
+    Closes the shared sessions and their connections.
+    """
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for s in sessions:
+        s.close()
+
+
+class RateLimiter:
+    """
+    A thread-safe token bucket limiting requests per minute.
+
+    Args:
+        rate (int): The number of requests allowed per minute, 0 for no limit.
+    """
+
+    def __init__(self, rate):
+        self.rate = rate
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent.
+        """
+        while True:
+            with self._lock:
+                if not self.rate:
+                    return
+                now = time.monotonic()
+                self._tokens = min(
+                    self.rate, self._tokens + (now - self._updated) * self.rate / 60
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * 60 / self.rate
+            time.sleep(wait)
+
+
+class _Call:
+    """An in-flight call of SingleFlight."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.waiters = 0
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Collapses identical concurrent calls into one.
+
+    The first caller for a key runs the call; callers arriving while it is
+    in flight wait for it and get their own copy of its result.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        """
+        Runs `func` unless a call for `key` is already in flight.
+
+        Args:
+            key (hashable): Identifies identical calls.
+            func (callable): The call to run.
+
+        Returns:
+            The result of the call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        result = None
+        try:
+            result = func()
+        except Exception as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                waiters = call.waiters
+            if waiters and call.error is None:
+                # the leader's caller may modify its result while waiters copy
+                call.result = copy.deepcopy(result)
+            call.done.set()
+        return result
+
+
+single_flight = SingleFlight()
@@ -0,0 +1,99 @@
+"""Rolling history of ACS air-quality readings."""
+from __future__ import annotations
+
+from array import array
+from collections import deque
+
+
+class RollingWindow:
+    """Fixed-size ring buffer with incrementally maintained statistics.
+
+    Every push is O(1) (amortized for min/max), no matter the window size.
+    """
+
+    def __init__(self, size: int) -> None:
+        """Initialize an empty window holding at most `size` samples."""
+        self._size = size
+        self._values = array("d", [0.0]) * size
+        self._total = 0
+        self._sum = 0.0
+        # sum of j * value where j is the position inside the window (0 = oldest)
+        self._weighted = 0.0
+        # monotonic deques of (sample number, value) for sliding min/max
+        self._min = deque()
+        self._max = deque()
+
+    def __len__(self) -> int:
+        """Return the number of samples currently in the window."""
+        return min(self._total, self._size)
+
+    def push(self, value: float) -> None:
+        """Append a sample, evicting the oldest one when the window is full."""
+        count = self._total
+        pos = count % self._size
+        if count >= self._size:
+            old = self._values[pos]
+            self._weighted -= self._sum - old
+            self._sum -= old
+        n = len(self)
+        self._values[pos] = value
+        self._weighted += min(n, self._size - 1) * value
+        self._sum += value
+        self._total = count + 1
+
+        first = self._total - self._size
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((count, value))
+        while self._min[0][0] < first:
+            self._min.popleft()
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((count, value))
+        while self._max[0][0] < first:
+            self._max.popleft()
+
+    @property
+    def latest(self) -> float | None:
+        """Return the newest sample."""
+        if not self._total:
+            return None
+        return self._values[(self._total - 1) % self._size]
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of the window."""
+        n = len(self)
+        return self._sum / n if n else None
+
+    @property
+    def minimum(self) -> float | None:
+        """Return the smallest sample in the window."""
+        return self._min[0][1] if self._min else None
+
+    @property
+    def maximum(self) -> float | None:
+        """Return the largest sample in the window."""
+        return self._max[0][1] if self._max else None
+
+    @property
+    def trend(self) -> float | None:
+        """Return the least-squares slope of the window, in units per sample."""
+        n = len(self)
+        if n < 2:
+            return None
+        sum_j = n * (n - 1) / 2
+        sum_j2 = (n - 1) * n * (2 * n - 1) / 6
+        return (n * self._weighted - sum_j * self._sum) / (n * sum_j2 - sum_j**2)
+
+    def as_attributes(self) -> dict[str, float | int | None]:
+        """Return the statistics as entity state attributes."""
+        mean = self.mean
+        trend = self.trend
+        return {
+            "samples": len(self),
+            "mean": round(mean, 1) if mean is not None else None,
+            "min": self.minimum,
+            "max": self.maximum,
+            "trend": round(trend, 2) if trend is not None else None,
+        }
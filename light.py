@@ -12,12 +12,12 @@ from homeassistant.components.light import (
 
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
-from .helper import request_data
+from .const import DOMAIN, SIGNAL_DEVICES_ADDED
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,12 +29,20 @@ async def async_setup_entry(
 ) -> None:
     """Setup lights"""
     coordinator = hass.data[DOMAIN]
-    entities = []
-    for device in coordinator.data["devices"]:
-        if device["type"] == "light" or device["type"] == "dimming":
-            entities.append(XiHomeLight(device, coordinator))
 
-    async_add_entities(entities)
+    @callback
+    def async_add_devices(devices) -> None:
+        entities = []
+        for device in devices:
+            if device["type"] == "light" or device["type"] == "dimming":
+                entities.append(XiHomeLight(device, coordinator))
+        coordinator.track_entities(entities)
+        async_add_entities(entities)
+
+    async_add_devices(coordinator.data["devices"])
+    config_entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_DEVICES_ADDED, async_add_devices)
+    )
 
 
 class XiHomeLight(CoordinatorEntity, LightEntity):
@@ -46,50 +54,30 @@ class XiHomeLight(CoordinatorEntity, LightEntity):
         super().__init__(coordinator, context=self.idx)
 
         self.entity_id = "light." + device_data["device_id"]
-        self._name = "{} Light {}".format(
+        self._attr_name = "{} Light {}".format(
             device_data["group"], device_data["name"].split(".")[0]
         )
         self._device_id = device_data["device_id"]
         self._group_id = device_data["groupID"]
-        self._state = device_data["status"]["power"]
         self._group = device_data["group"]
         self._type = device_data["type"]
+        self._attr_unique_id = self._device_id + str(self.idx)
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, self._group)})
         self._brightness = -1
         # brightness range: 1-4 when on, 0 when off
         if self._type == "dimming":
             self._attr_supported_color_modes = {ColorMode.BRIGHTNESS}
-            self.color_mode = ColorMode.BRIGHTNESS
+            self._attr_color_mode = ColorMode.BRIGHTNESS
             self._brightness = int(device_data["status"]["dimming"])
         else:
             self._attr_supported_color_modes = {ColorMode.ONOFF}
-            self.color_mode = ColorMode.ONOFF
-
-    @property
-    def name(self) -> str:
-        """Return the display name of this light."""
-        return self._name
-
-    @property
-    def is_on(self) -> bool | None:
-        """Return true if light is on."""
-        return self._state
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique, Home Assistant friendly identifier for this entity."""
-        return self._device_id + str(self.idx)
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._group)},
-        )
+            self._attr_color_mode = ColorMode.ONOFF
+        self._set_state(device_data["status"]["power"])
 
-    @property
-    def brightness(self):
-        """Return the brightness of the light."""
-        return int(self._brightness / 4 * 255)
+    def _set_state(self, state) -> None:
+        """Store the power state and brightness in the entity attributes."""
+        self._attr_is_on = state
+        self._attr_brightness = int(self._brightness / 4 * 255)
 
     def turn_on(self, **kwargs: Any) -> None:
         """Instruct the light to turn on."""
@@ -107,8 +95,8 @@ class XiHomeLight(CoordinatorEntity, LightEntity):
         if self._type == "dimming":
             body["status"]["dimming"] = str(self._brightness)
 
-        _response = request_data("/device/command", self.coordinator.token, body)
-        self._state = True
+        _response = self.coordinator.request("/device/command", body)
+        self._set_state(True)
         self.schedule_update_ha_state()
 
     def turn_off(self, **kwargs: Any) -> None:
@@ -123,14 +111,14 @@ class XiHomeLight(CoordinatorEntity, LightEntity):
         if self._type == "dimming":
             body["status"]["dimming"] = "0"
 
-        _response = request_data("/device/command", self.coordinator.token, body)
-        self._state = False
+        _response = self.coordinator.request("/device/command", body)
+        self._set_state(False)
         self.schedule_update_ha_state()
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self._state = self.coordinator.data["indexed_devices"][self.idx]["status"][
-            "power"
-        ]
+        self._set_state(
+            self.coordinator.data["indexed_devices"][self.idx]["status"]["power"]
+        )
         self.async_write_ha_state()
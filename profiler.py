@@ -0,0 +1,100 @@
+"""Timing spans and cProfile capture for poll cycles and commands."""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+import io
+import os
+import pstats
+import threading
+import time
+
+
+class PollProfiler:
+    """Collect per-stage timings over a number of poll cycles."""
+
+    def __init__(self, cycles: int, use_cprofile: bool = False) -> None:
+        """Initialize a PollProfiler."""
+        self.remaining = cycles
+        self.finished = asyncio.Event()
+        self.cprofile = cProfile.Profile() if use_cprofile else None
+        self._spans: dict[str, list[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._cprofile_lock = threading.Lock()
+        self._started = datetime.now()
+
+    @contextmanager
+    def span(self, name: str):
+        """Time the enclosed block under `name`."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def record(self, name: str, duration: float) -> None:
+        """Record one duration, in seconds, for `name`."""
+        with self._lock:
+            self._spans[name].append(duration)
+
+    @contextmanager
+    def profile(self):
+        """Run the enclosed block under cProfile, if enabled."""
+        if self.cprofile is None or not self._cprofile_lock.acquire(blocking=False):
+            yield
+            return
+        self.cprofile.enable()
+        try:
+            yield
+        finally:
+            self.cprofile.disable()
+            self._cprofile_lock.release()
+
+    def cycle_done(self) -> None:
+        """Count a finished poll cycle. Must be called from the event loop."""
+        self.remaining -= 1
+        if self.remaining <= 0:
+            self.finished.set()
+
+    def report(self) -> str:
+        """Return the collected timings as a text table."""
+        lines = [
+            "xi_home profile started {}".format(self._started.isoformat()),
+            "",
+            "{:<40} {:>6} {:>10} {:>10} {:>10}".format(
+                "span", "count", "total ms", "mean ms", "max ms"
+            ),
+        ]
+        with self._lock:
+            spans = sorted(self._spans.items(), key=lambda item: -sum(item[1]))
+        for name, durations in spans:
+            total = sum(durations)
+            lines.append(
+                "{:<40} {:>6} {:>10.1f} {:>10.1f} {:>10.1f}".format(
+                    name,
+                    len(durations),
+                    total * 1000,
+                    total / len(durations) * 1000,
+                    max(durations) * 1000,
+                )
+            )
+        if self.cprofile is not None:
+            stream = io.StringIO()
+            stats = pstats.Stats(self.cprofile, stream=stream)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(30)
+            lines += ["", stream.getvalue()]
+        return "\n".join(lines)
+
+    def write_report(self, directory: str) -> str:
+        """Write the report (and cProfile dump) to `directory`."""
+        base = os.path.join(
+            directory, "xi_home_profile_{:%Y%m%d_%H%M%S}".format(self._started)
+        )
+        with open(base + ".txt", "w", encoding="utf-8") as report:
+            report.write(self.report())
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(base + ".prof")
+        return base + ".txt"
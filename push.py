@@ -0,0 +1,93 @@
+"""Long-lived push channel for device status updates."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .helper import header
+
+_LOGGER = logging.getLogger(__name__)
+
+# seconds between reconnection attempts, doubled after each failure
+RECONNECT_MIN = 1
+RECONNECT_MAX = 300
+
+
+class PushListener:
+    """Keep a websocket open and apply the status patches it sends.
+
+    Every text message is a JSON object with either a single device
+    (`idx` or `device_id` plus a partial `status`) or a `devices` list of
+    those. While the channel is up the coordinator only polls as a safety
+    net; when it drops, regular polling resumes until it reconnects.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator, url: str) -> None:
+        """Initialize a PushListener."""
+        self.hass = hass
+        self.coordinator = coordinator
+        self.url = url
+        self.messages = 0
+        self._task: asyncio.Task | None = None
+
+    def async_start(self) -> None:
+        """Start listening in the background."""
+        self._task = self.hass.async_create_background_task(
+            self._async_run(), "xi_home push listener"
+        )
+
+    async def async_stop(self) -> None:
+        """Stop listening."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self.coordinator.async_push_disconnected(catch_up=False)
+
+    async def _async_run(self) -> None:
+        """Connect, listen and reconnect with exponential backoff."""
+        delay = RECONNECT_MIN
+        while True:
+            try:
+                await self._async_listen()
+                delay = RECONNECT_MIN
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as err:
+                _LOGGER.debug("Push channel %s failed: %s", self.url, err)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected error on push channel %s", self.url)
+            self.coordinator.async_push_disconnected()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX)
+
+    async def _async_listen(self) -> None:
+        """Listen on one websocket connection until it closes."""
+        session = async_get_clientsession(self.hass)
+        async with session.ws_connect(
+            self.url, headers=header(self.coordinator.token), heartbeat=30
+        ) as websocket:
+            await websocket.send_json(
+                {
+                    "type": "subscribe",
+                    "userid": self.coordinator.user_id,
+                    "sessionid": self.coordinator.session_id,
+                }
+            )
+            self.coordinator.async_push_connected()
+            async for message in websocket:
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    self.messages += 1
+                    self.coordinator.async_apply_push(message.json())
+                elif message.type in (
+                    aiohttp.WSMsgType.CLOSED,
+                    aiohttp.WSMsgType.ERROR,
+                ):
+                    break
@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from typing import Any
 
 from homeassistant.components.sensor import (
     SensorDeviceClass,
@@ -11,14 +12,37 @@ from homeassistant.components.sensor import (
 
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-from .const import DOMAIN
+from .aggregate import (
+    AGGREGATE_TYPES,
+    HEATING_ON,
+    HOME_GROUP,
+    LIGHTS_ON,
+    WORST_CO2,
+    WORST_PM25,
+)
+from .const import (
+    CONF_CO2_DEADBAND,
+    CONF_PM25_DEADBAND,
+    DOMAIN,
+    SIGNAL_DEVICES_ADDED,
+    SIGNAL_DEVICES_REMOVED,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+AGGREGATE_SENSORS = {
+    LIGHTS_ON: ("Lights On", None, None),
+    HEATING_ON: ("Heating On", None, None),
+    WORST_PM25: ("Worst PM2.5", SensorDeviceClass.PM25, "µg/m³"),
+    WORST_CO2: ("Worst CO2", SensorDeviceClass.CO2, "ppm"),
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -27,13 +51,69 @@ async def async_setup_entry(
 ) -> None:
     """Setup sensors"""
     coordinator = hass.data[DOMAIN]
-    entities = []
-    for device in coordinator.data["devices"]:
-        if device["type"] == "acs":
-            entities.append(XiHomePM25Sensor(device, coordinator))
-            entities.append(XiHomeCO2Sensor(device, coordinator))
+    # (group, aggregate) -> sensor
+    aggregates = {}
+
+    @callback
+    def async_add_devices(devices) -> None:
+        entities = []
+        for device in devices:
+            if device["type"] == "acs":
+                entities.append(XiHomePM25Sensor(device, coordinator))
+                entities.append(XiHomeCO2Sensor(device, coordinator))
+                entities.append(XiHomeSmellSensor(device, coordinator))
+
+        # aggregates of the rooms and device types that are new
+        for group, key in aggregate_keys(coordinator.data):
+            if (group, key) not in aggregates:
+                sensor = XiHomeAggregateSensor(group, key, coordinator)
+                aggregates[(group, key)] = sensor
+                entities.append(sensor)
+
+        coordinator.track_entities(entities)
+        async_add_entities(entities)
 
-    async_add_entities(entities)
+    @callback
+    def async_remove_aggregates(_removed) -> None:
+        """Remove the aggregates no listed device contributes to anymore."""
+        entity_registry = er.async_get(hass)
+        for group_key in aggregates.keys() - set(aggregate_keys(coordinator.data)):
+            sensor = aggregates.pop(group_key)
+            if entity_registry.async_get(sensor.entity_id) is not None:
+                # the sensor removes itself with its registry entry
+                entity_registry.async_remove(sensor.entity_id)
+            elif sensor.hass is not None:
+                hass.async_create_task(sensor.async_remove())
+
+    async_add_devices(coordinator.data["devices"])
+    config_entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_DEVICES_ADDED, async_add_devices)
+    )
+    config_entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_DEVICES_REMOVED, async_remove_aggregates)
+    )
+
+
+def aggregate_keys(data) -> list[tuple[str, str]]:
+    """Return the (group, aggregate) pairs the listed devices contribute to."""
+    types_by_group = {HOME_GROUP: set()}
+    for device in data["devices"]:
+        types_by_group.setdefault(device["group"], set()).add(device["type"])
+        types_by_group[HOME_GROUP].add(device["type"])
+    groups = [room["name"] for room in data["groups"]] + [HOME_GROUP]
+    return [
+        (group, key)
+        for group in groups
+        for key, device_types in AGGREGATE_TYPES.items()
+        if types_by_group.get(group, set()) & set(device_types)
+    ]
+
+
+def air_quality_values(air_quality, idx) -> dict:
+    """Return the latest air quality readings of an acs device, if any."""
+    if air_quality.data is None:
+        return {}
+    return air_quality.data["devices"].get(idx, {})
 
 
 class XiHomePM25Sensor(CoordinatorEntity, SensorEntity):
@@ -42,45 +122,56 @@ class XiHomePM25Sensor(CoordinatorEntity, SensorEntity):
     def __init__(self, device_data, coordinator) -> None:
         """Initialize an XiHomePM25Sensor."""
         self.idx = device_data["idx"]
-        super().__init__(coordinator, context=self.idx)
+        super().__init__(coordinator.air_quality, context=self.idx)
 
         self._group = device_data["group"]
         self.entity_id = "sensor." + device_data["device_id"] + "_PM25"
-        self._name = "{} PM2.5 Sensor".format(device_data["group"])
+        self._attr_name = "{} PM2.5 Sensor".format(device_data["group"])
+        self._attr_unique_id = self.entity_id + str(self.idx)
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, self._group)})
 
         self._attr_device_class = SensorDeviceClass.PM25
         self._attr_native_unit_of_measurement = "µg/m³"
         self._attr_state_class = SensorStateClass.MEASUREMENT
 
-        status = device_data["status"]
-        if status:
-            self._attr_native_value = int(status["dust_value"])
-
-    @property
-    def name(self) -> str:
-        """Return the display name of this sensor."""
-        return self._name
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique, Home Assistant friendly identifier for this entity."""
-        return self.entity_id + str(self.idx)
+        self._write_filter = coordinator.write_filter(CONF_PM25_DEADBAND)
+        self._last_available = self.coordinator.last_update_success
+        values = air_quality_values(self.coordinator, self.idx)
+        if values:
+            self._attr_native_value = int(values["dust_value"])
+            self._write_filter.record(self._attr_native_value)
 
     @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._group)},
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return rolling statistics and the time the reading was fetched."""
+        attributes = {"suppressed_writes": self._write_filter.suppressed}
+        history = self.coordinator.acs_history.get(self.idx)
+        if history is not None:
+            attributes.update(history["dust_value"].as_attributes())
+        attributes["fetched_at"] = air_quality_values(self.coordinator, self.idx).get(
+            "fetched_at"
         )
+        return attributes
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        status = self.coordinator.data["indexed_devices"][self.idx]["status"]
-        if not status:
+        values = air_quality_values(self.coordinator, self.idx)
+        if self.coordinator.last_update_success != self._last_available:
+            # availability changed; write whatever the reading did
+            self._last_available = self.coordinator.last_update_success
+            if values:
+                self._attr_native_value = int(values["dust_value"])
+                self._write_filter.record(self._attr_native_value)
+            self.async_write_ha_state()
+            return
+        if not values:
             return
 
-        self._attr_native_value = int(status["dust_value"])
+        value = int(values["dust_value"])
+        if not self._write_filter.should_write(value):
+            return
+        self._attr_native_value = value
         self.async_write_ha_state()
 
 
@@ -90,43 +181,143 @@ class XiHomeCO2Sensor(CoordinatorEntity, SensorEntity):
     def __init__(self, device_data, coordinator) -> None:
         """Initialize an XiHomeCO2Sensor."""
         self.idx = device_data["idx"]
-        super().__init__(coordinator, context=self.idx)
+        super().__init__(coordinator.air_quality, context=self.idx)
 
         self._group = device_data["group"]
         self.entity_id = "sensor." + device_data["device_id"] + "_CO2"
-        self._name = "{} CO2 Sensor".format(device_data["group"])
+        self._attr_name = "{} CO2 Sensor".format(device_data["group"])
+        self._attr_unique_id = self.entity_id + str(self.idx)
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, self._group)})
 
         self._attr_device_class = SensorDeviceClass.CO2
         self._attr_native_unit_of_measurement = "ppm"
         self._attr_state_class = SensorStateClass.MEASUREMENT
 
-        status = device_data["status"]
-        if status:
-            self._attr_native_value = int(status["co2_value"])
+        self._write_filter = coordinator.write_filter(CONF_CO2_DEADBAND)
+        self._last_available = self.coordinator.last_update_success
+        values = air_quality_values(self.coordinator, self.idx)
+        if values:
+            self._attr_native_value = int(values["co2_value"])
+            self._write_filter.record(self._attr_native_value)
 
     @property
-    def name(self) -> str:
-        """Return the display name of this sensor."""
-        return self._name
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return rolling statistics and the time the reading was fetched."""
+        attributes = {"suppressed_writes": self._write_filter.suppressed}
+        history = self.coordinator.acs_history.get(self.idx)
+        if history is not None:
+            attributes.update(history["co2_value"].as_attributes())
+        attributes["fetched_at"] = air_quality_values(self.coordinator, self.idx).get(
+            "fetched_at"
+        )
+        return attributes
 
-    @property
-    def unique_id(self) -> str:
-        """Return a unique, Home Assistant friendly identifier for this entity."""
-        return self.entity_id + str(self.idx)
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        values = air_quality_values(self.coordinator, self.idx)
+        if self.coordinator.last_update_success != self._last_available:
+            # availability changed; write whatever the reading did
+            self._last_available = self.coordinator.last_update_success
+            if values:
+                self._attr_native_value = int(values["co2_value"])
+                self._write_filter.record(self._attr_native_value)
+            self.async_write_ha_state()
+            return
+        if not values:
+            return
+
+        value = int(values["co2_value"])
+        if not self._write_filter.should_write(value):
+            return
+        self._attr_native_value = value
+        self.async_write_ha_state()
+
+
+class XiHomeSmellSensor(CoordinatorEntity, SensorEntity):
+    """Representation of an Xihome Smell Sensor."""
+
+    def __init__(self, device_data, coordinator) -> None:
+        """Initialize an XiHomeSmellSensor."""
+        self.idx = device_data["idx"]
+        super().__init__(coordinator.air_quality, context=self.idx)
+
+        self._group = device_data["group"]
+        self.entity_id = "sensor." + device_data["device_id"] + "_smell"
+        self._attr_name = "{} Smell Sensor".format(device_data["group"])
+        self._attr_unique_id = self.entity_id + str(self.idx)
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, self._group)})
+
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+        values = air_quality_values(self.coordinator, self.idx)
+        if values:
+            self._attr_native_value = int(values["smell_value"])
 
     @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._group)},
-        )
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return rolling statistics and the time the reading was fetched."""
+        attributes = {
+            "fetched_at": air_quality_values(self.coordinator, self.idx).get(
+                "fetched_at"
+            )
+        }
+        history = self.coordinator.acs_history.get(self.idx)
+        if history is not None:
+            attributes.update(history["smell_value"].as_attributes())
+        return attributes
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        status = self.coordinator.data["indexed_devices"][self.idx]["status"]
-        if not status:
+        values = air_quality_values(self.coordinator, self.idx)
+        if not values:
             return
 
-        self._attr_native_value = int(status["co2_value"])
+        self._attr_native_value = int(values["smell_value"])
+        self.async_write_ha_state()
+
+
+class XiHomeAggregateSensor(CoordinatorEntity, SensorEntity):
+    """Representation of a per-room or whole-home aggregate."""
+
+    def __init__(self, group, key, coordinator) -> None:
+        """Initialize an XiHomeAggregateSensor."""
+        # worst readings follow the air quality coordinator, which only
+        # fetches the groups with an enabled aggregate
+        if key in (WORST_PM25, WORST_CO2):
+            super().__init__(coordinator.air_quality, context=group)
+        else:
+            super().__init__(coordinator, context=group)
+        self._aggregates = coordinator.aggregates
+
+        self._group = group
+        self._key = key
+        name, device_class, unit = AGGREGATE_SENSORS[key]
+        self._attr_name = "{} {}".format("Home" if group == HOME_GROUP else group, name)
+        self._attr_unique_id = "{}_{}_{}".format(DOMAIN, self._group, self._key)
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, self._group)})
+
+        self._attr_device_class = device_class
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_native_value = coordinator.aggregates.value(group, key)
+        self._last_available = self.coordinator.last_update_success
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        available = self.coordinator.last_update_success
+        if available != self._last_available:
+            self._last_available = available
+            self._attr_native_value = self._aggregates.value(self._group, self._key)
+            self.async_write_ha_state()
+            return
+        if self._group not in self.coordinator.changed_groups:
+            return
+
+        value = self._aggregates.value(self._group, self._key)
+        if value == self._attr_native_value:
+            return
+        self._attr_native_value = value
         self.async_write_ha_state()
@@ -0,0 +1,218 @@
+"""Services for the xi_home integration."""
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+import logging
+import os
+
+import async_timeout
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.service import async_register_admin_service
+from homeassistant.util import dt as dt_util
+
+from .capture import TrafficRecorder, TrafficReplayer
+from .const import DOMAIN
+from .profiler import PollProfiler
+from .timeseries import TIERS
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_PROFILE = "profile"
+SERVICE_START_CAPTURE = "start_capture"
+SERVICE_STOP_CAPTURE = "stop_capture"
+SERVICE_START_REPLAY = "start_replay"
+SERVICE_STOP_REPLAY = "stop_replay"
+SERVICE_EXPORT_HISTORY = "export_history"
+
+# hass.data key of the profile task waiting for scheduled polls
+DATA_PROFILE_TASK = DOMAIN + "_profile_task"
+
+
+def config_filename(value) -> str:
+    """Validate the name of a file directly in the config directory."""
+    value = cv.string(value)
+    if os.path.basename(value) != value or "\\" in value or value.startswith("."):
+        raise vol.Invalid("expected a file name without directories")
+    return value
+
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("cycles", default=1): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=60)
+        ),
+        vol.Optional("cprofile", default=False): cv.boolean,
+        vol.Optional("wait", default=False): cv.boolean,
+    }
+)
+START_CAPTURE_SCHEMA = vol.Schema({vol.Optional("filename"): config_filename})
+START_REPLAY_SCHEMA = vol.Schema(
+    {
+        vol.Required("filename"): config_filename,
+        vol.Optional("speed", default=1.0): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
+EXPORT_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required("start"): cv.datetime,
+        vol.Optional("end"): cv.datetime,
+        vol.Optional("resolution"): vol.In(list(TIERS)),
+        vol.Optional("filename"): config_filename,
+    }
+)
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the xi_home services."""
+
+    async def async_profile(call: ServiceCall) -> None:
+        """Profile poll cycles and write a report to the config directory."""
+        profiler = PollProfiler(call.data["cycles"], call.data["cprofile"])
+        if call.data["wait"]:
+            hass.data[DATA_PROFILE_TASK] = hass.async_create_task(
+                async_run_profiler(hass, profiler, wait=True)
+            )
+        else:
+            await async_run_profiler(hass, profiler, wait=False)
+
+    async def async_start_capture(call: ServiceCall) -> None:
+        """Record api traffic to a file in the config directory."""
+        coordinator = hass.data[DOMAIN]
+        if coordinator.recorder is not None:
+            _LOGGER.warning("Already capturing to %s", coordinator.recorder.filename)
+            return
+        filename = call.data.get(
+            "filename",
+            "xi_home_capture_{:%Y%m%d_%H%M%S}.jsonl.gz".format(datetime.now()),
+        )
+        coordinator.recorder = await hass.async_add_executor_job(
+            TrafficRecorder, hass.config.path(filename)
+        )
+
+    async def async_stop_capture(call: ServiceCall) -> None:
+        """Stop recording api traffic."""
+        await async_close_recorder(hass, hass.data[DOMAIN])
+
+    async def async_start_replay(call: ServiceCall) -> None:
+        """Answer api requests from a capture file instead of the backend."""
+        replayer = await hass.async_add_executor_job(
+            TrafficReplayer,
+            hass.config.path(call.data["filename"]),
+            call.data["speed"],
+        )
+        hass.data[DOMAIN].start_replay(replayer)
+
+    async def async_stop_replay(call: ServiceCall) -> None:
+        """Go back to the real backend."""
+        hass.data[DOMAIN].stop_replay()
+
+    async def async_export_history(call: ServiceCall) -> None:
+        """Write stored readings in a time range to a CSV file."""
+        store = hass.data[DOMAIN].store
+        start = dt_util.as_timestamp(call.data["start"])
+        end = dt_util.as_timestamp(call.data.get("end", dt_util.utcnow()))
+        filename = hass.config.path(
+            call.data.get(
+                "filename",
+                "xi_home_history_{:%Y%m%d_%H%M%S}.csv.gz".format(datetime.now()),
+            )
+        )
+        rows = await hass.async_add_executor_job(
+            store.export, filename, start, end, call.data.get("resolution")
+        )
+        _LOGGER.info("Exported %d xi_home readings to %s", rows, filename)
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_PROFILE, async_profile, schema=PROFILE_SCHEMA
+    )
+    # these read and write files, so only admins may call them
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_START_CAPTURE,
+        async_start_capture,
+        schema=START_CAPTURE_SCHEMA,
+    )
+    async_register_admin_service(hass, DOMAIN, SERVICE_STOP_CAPTURE, async_stop_capture)
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_START_REPLAY,
+        async_start_replay,
+        schema=START_REPLAY_SCHEMA,
+    )
+    async_register_admin_service(hass, DOMAIN, SERVICE_STOP_REPLAY, async_stop_replay)
+    async_register_admin_service(
+        hass,
+        DOMAIN,
+        SERVICE_EXPORT_HISTORY,
+        async_export_history,
+        schema=EXPORT_HISTORY_SCHEMA,
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the xi_home services and stop a profile waiting for polls."""
+    task = hass.data.pop(DATA_PROFILE_TASK, None)
+    if task is not None:
+        task.cancel()
+    for service in (
+        SERVICE_PROFILE,
+        SERVICE_START_CAPTURE,
+        SERVICE_STOP_CAPTURE,
+        SERVICE_START_REPLAY,
+        SERVICE_STOP_REPLAY,
+        SERVICE_EXPORT_HISTORY,
+    ):
+        hass.services.async_remove(DOMAIN, service)
+
+
+async def async_close_recorder(hass: HomeAssistant, coordinator) -> None:
+    """Stop a running capture and finish its file."""
+    recorder, coordinator.recorder = coordinator.recorder, None
+    if recorder is not None:
+        await hass.async_add_executor_job(recorder.close)
+        _LOGGER.info("Captured %d requests to %s", recorder.count, recorder.filename)
+
+
+async def async_run_profiler(hass: HomeAssistant, profiler: PollProfiler, wait) -> None:
+    """Attach a profiler to the coordinator for a number of poll cycles.
+
+    With `wait` the profiler covers the next scheduled polls and every
+    command sent meanwhile, otherwise the polls are run right away. A wait
+    gives up after one poll interval more than the polls should take and
+    reports what it collected.
+    """
+    coordinator = hass.data[DOMAIN]
+    if coordinator.profiler is not None:
+        _LOGGER.warning("An xi_home profile is already running")
+        return
+    coordinator.profiler = profiler
+    try:
+        if wait:
+            timeout = (profiler.remaining + 1) * (
+                coordinator.update_interval.total_seconds()
+            )
+            try:
+                async with async_timeout.timeout(timeout):
+                    await profiler.finished.wait()
+            except asyncio.TimeoutError:
+                _LOGGER.warning(
+                    "Profile stopped waiting with %d poll cycles left",
+                    profiler.remaining,
+                )
+        else:
+            while not profiler.finished.is_set():
+                await coordinator.async_refresh()
+    finally:
+        coordinator.profiler = None
+    path = await hass.async_add_executor_job(
+        profiler.write_report, hass.config.path()
+    )
+    _LOGGER.info("Wrote xi_home profile to %s", path)
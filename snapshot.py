@@ -0,0 +1,74 @@
+"""Immutable snapshots of the coordinator data.
+
+A snapshot is never changed once published. Updates build a new snapshot
+that shares every unchanged device with the old one and is swapped in on
+the event loop, so any thread can read a snapshot without locking and
+entities can keep references to device snapshots.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from types import MappingProxyType
+
+
+def freeze(value):
+    """Return a read-only copy of a JSON-like value."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def freeze_data(data) -> Mapping:
+    """Return a snapshot of a list-redis response with its devices indexed by idx.
+
+    "devices" and "indexed_devices" share the same device snapshots.
+    """
+    indexed = {device["idx"]: freeze(device) for device in data["devices"]}
+    rest = {key: freeze(value) for key, value in data.items() if key != "devices"}
+    return snapshot(rest, indexed)
+
+
+def snapshot(data, indexed) -> Mapping:
+    """Return a snapshot of the frozen parts of `data` and the devices by idx."""
+    return MappingProxyType(
+        {
+            **{
+                key: value
+                for key, value in data.items()
+                if key not in ("devices", "indexed_devices")
+            },
+            "devices": tuple(indexed.values()),
+            "indexed_devices": MappingProxyType(indexed),
+        }
+    )
+
+
+def with_status(data, patches) -> Mapping:
+    """Return a snapshot of `data` with the {idx: status changes} applied."""
+    indexed = dict(data["indexed_devices"])
+    for idx, changes in patches.items():
+        device = indexed[idx]
+        indexed[idx] = MappingProxyType(
+            {**device, "status": freeze({**device["status"], **changes})}
+        )
+    return snapshot(data, indexed)
+
+
+def status_changes(old, new) -> dict:
+    """Return the {field: {"old": value, "new": value}} that differ."""
+    return {
+        key: {"old": old.get(key), "new": value}
+        for key, value in new.items()
+        if old.get(key) != value
+    }
+
+
+def thaw(value):
+    """Return a mutable copy of a frozen value."""
+    if isinstance(value, Mapping):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
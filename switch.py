@@ -7,12 +7,12 @@ from typing import Any
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
-from .helper import request_data
+from .const import DOMAIN, SIGNAL_DEVICES_ADDED
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -24,12 +24,20 @@ async def async_setup_entry(
 ) -> None:
     """Setup switches"""
     coordinator = hass.data[DOMAIN]
-    entities = []
-    for device in coordinator.data["devices"]:
-        if device["type"] == "lightall":
-            entities.append(XiHomeAllLightSwtich(device, coordinator))
 
-    async_add_entities(entities)
+    @callback
+    def async_add_devices(devices) -> None:
+        entities = []
+        for device in devices:
+            if device["type"] == "lightall":
+                entities.append(XiHomeAllLightSwtich(device, coordinator))
+        coordinator.track_entities(entities)
+        async_add_entities(entities)
+
+    async_add_devices(coordinator.data["devices"])
+    config_entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_DEVICES_ADDED, async_add_devices)
+    )
 
 
 class XiHomeAllLightSwtich(CoordinatorEntity, SwitchEntity):
@@ -41,34 +49,14 @@ class XiHomeAllLightSwtich(CoordinatorEntity, SwitchEntity):
         super().__init__(coordinator, context=self.idx)
 
         self.entity_id = "switch." + device_data["device_id"]
-        self._name = "All light switch"
+        self._attr_name = "All light switch"
         self._device_id = device_data["device_id"]
         self._group_id = device_data["groupID"]
-        self._state = device_data["status"]["power"]
+        self._attr_is_on = device_data["status"]["power"]
         self._group = device_data["group"]
         self._type = device_data["type"]
-
-    @property
-    def name(self) -> str:
-        """Return the display name of this switch."""
-        return self._name
-
-    @property
-    def is_on(self) -> bool | None:
-        """Return true if switch is on."""
-        return self._state
-
-    @property
-    def unique_id(self) -> str:
-        """Return a unique, Home Assistant friendly identifier for this entity."""
-        return self._device_id + str(self.idx)
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return the device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._group)},
-        )
+        self._attr_unique_id = self._device_id + str(self.idx)
+        self._attr_device_info = DeviceInfo(identifiers={(DOMAIN, self._group)})
 
     def turn_on(self, **kwargs: Any) -> None:
         """Instruct the switch to turn on."""
@@ -79,8 +67,8 @@ class XiHomeAllLightSwtich(CoordinatorEntity, SwitchEntity):
             "status": {"power": True},
             "userid": self.coordinator.user_id,
         }
-        _response = request_data("/device/command", self.coordinator.token, body)
-        self._state = True
+        _response = self.coordinator.request("/device/command", body)
+        self._attr_is_on = True
         self.schedule_update_ha_state()
 
     def turn_off(self, **kwargs: Any) -> None:
@@ -93,14 +81,14 @@ class XiHomeAllLightSwtich(CoordinatorEntity, SwitchEntity):
             "userid": self.coordinator.user_id,
         }
 
-        _response = request_data("/device/command", self.coordinator.token, body)
-        self._state = False
+        _response = self.coordinator.request("/device/command", body)
+        self._attr_is_on = False
         self.schedule_update_ha_state()
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self._state = self.coordinator.data["indexed_devices"][self.idx]["status"][
-            "power"
-        ]
+        self._attr_is_on = self.coordinator.data["indexed_devices"][self.idx][
+            "status"
+        ]["power"]
         self.async_write_ha_state()
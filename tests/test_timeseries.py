@@ -0,0 +1,93 @@
+"""Tests of the columnar time series store."""
+import csv
+import gzip
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from timeseries import (  # noqa: E402
+    FIVE_MINUTES,
+    HOUR,
+    RAW,
+    TIERS,
+    TimeSeriesStore,
+    day_of,
+)
+
+DAY = 86400
+# 2025-10-19 12:00:00 UTC
+NOW = 1760875200
+MIDNIGHT = NOW - NOW % DAY
+
+
+def test_append_across_growth(tmp_path):
+    """Samples survive the segment doubling its capacity, open and reopened."""
+    store = TimeSeriesStore(str(tmp_path))
+    count = TIERS[RAW][2] * 2 + 100
+    store.append(
+        ("1.pm25", MIDNIGHT + second, float(second)) for second in range(count)
+    )
+
+    expected = [(MIDNIGHT + second, float(second)) for second in range(count)]
+    assert store.read("1.pm25", MIDNIGHT, MIDNIGHT + DAY) == expected
+    store.close()
+    assert (
+        TimeSeriesStore(str(tmp_path)).read("1.pm25", MIDNIGHT, MIDNIGHT + DAY)
+        == expected
+    )
+
+
+def test_compact_downsamples_and_drops_expired_days(tmp_path):
+    """Complete days get bucket means and leave the tiers past retention."""
+    store = TimeSeriesStore(str(tmp_path))
+    old = MIDNIGHT - 10 * DAY
+    ancient = MIDNIGHT - 100 * DAY
+    store.append(
+        ("1.co2", old + minute * 60, float(minute % 10)) for minute in range(60)
+    )
+    store.append([("1.co2", ancient + 60, 500.0)])
+    store.compact(NOW)
+
+    assert not os.path.exists(os.path.join(tmp_path, RAW, "1.co2"))
+    # one 5 minute bucket per 5 samples of 0..4 and 5..9
+    assert store.read("1.co2", old, old + DAY, FIVE_MINUTES) == [
+        (old + bucket * 300, 2.0 if bucket % 2 == 0 else 7.0) for bucket in range(12)
+    ]
+    assert store.read("1.co2", old, old + DAY, HOUR) == [(old, 4.5)]
+    assert store.read("1.co2", ancient, ancient + DAY, FIVE_MINUTES) == []
+    assert store.read("1.co2", ancient, ancient + DAY, HOUR) == [(ancient, 500.0)]
+
+
+def test_read_spans_compacted_and_uncompacted_days(tmp_path):
+    """Coarse reads include today, which only the raw tier holds."""
+    store = TimeSeriesStore(str(tmp_path))
+    start = MIDNIGHT - DAY
+    store.append(("2.curtemp", timestamp, 20.0) for timestamp in range(start, NOW, 60))
+    store.compact(NOW)
+
+    assert day_of(MIDNIGHT) not in os.listdir(os.path.join(tmp_path, FIVE_MINUTES))
+    samples = store.read("2.curtemp", start, NOW, FIVE_MINUTES)
+    assert len(samples) == (NOW - start) // 300
+    assert samples[-1] == (NOW - 300, 20.0)
+    assert len(store.read("2.curtemp", start, NOW, HOUR)) == (NOW - start) // 3600
+
+
+def test_export_row_count(tmp_path):
+    """Every sample of every series in the range becomes one CSV row."""
+    store = TimeSeriesStore(str(tmp_path / "store"))
+    store.append(("1.pm25", NOW - minute * 60, 10.0) for minute in range(30))
+    store.append(("2.settemp", NOW - minute * 60, 22.0) for minute in range(30))
+    filename = str(tmp_path / "export.csv.gz")
+
+    rows = store.export(filename, NOW - 10 * 60, NOW + 1, RAW)
+
+    assert rows == 22
+    with gzip.open(filename, "rt", encoding="utf-8") as file:
+        lines = list(csv.reader(file))
+    assert lines[0] == ["time", "idx", "field", "value"]
+    assert len(lines) == rows + 1
+    assert {(line[1], line[2]) for line in lines[1:]} == {
+        ("1", "pm25"),
+        ("2", "settemp"),
+    }
@@ -0,0 +1,310 @@
+"""Append-only, memory-mapped columnar store of device readings.
+
+Every series (one field of one device) is split into one segment file per
+UTC day and tier. A segment holds a header, a column of uint32 timestamps
+and a column of float32 values, so a sample costs 8 bytes. Complete days
+are downsampled into coarser tiers and whole segment files are dropped
+once they fall out of their tier's retention.
+"""
+from __future__ import annotations
+
+from array import array
+import csv
+from datetime import datetime, timezone
+import gzip
+import mmap
+import os
+import struct
+import threading
+import time
+
+MAGIC = b"XTS1"
+# magic, number of samples, capacity in samples
+HEADER = struct.Struct("<4sII")
+
+RAW = "raw"
+FIVE_MINUTES = "5min"
+HOUR = "hour"
+# tier -> (bucket seconds, days kept, initial capacity of a day segment)
+TIERS = {
+    RAW: (0, 7, 2048),
+    FIVE_MINUTES: (300, 90, 288),
+    HOUR: (3600, 3650, 24),
+}
+# tier -> the tier it is downsampled from
+DOWNSAMPLED_FROM = {FIVE_MINUTES: RAW, HOUR: FIVE_MINUTES}
+
+
+def day_of(timestamp: float) -> str:
+    """Return the UTC day a timestamp falls on, as used in segment names."""
+    return time.strftime("%Y-%m-%d", time.gmtime(timestamp))
+
+
+class Segment:
+    """One day of one series in one tier, memory-mapped for appending."""
+
+    def __init__(self, path: str, capacity: int) -> None:
+        """Open the segment at `path`, creating it with `capacity` if missing."""
+        self.path = path
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as file:
+                file.write(HEADER.pack(MAGIC, 0, capacity))
+                file.truncate(HEADER.size + 8 * capacity)
+        self._open()
+
+    def _open(self) -> None:
+        self._file = open(self.path, "r+b")
+        self._map = mmap.mmap(self._file.fileno(), 0)
+        magic, self.count, self.capacity = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError("{} is not a time series segment".format(self.path))
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Append one sample, growing the segment when it is full."""
+        if self.count == self.capacity:
+            self._grow()
+        struct.pack_into(
+            "<I", self._map, HEADER.size + 4 * self.count, int(timestamp)
+        )
+        struct.pack_into(
+            "<f",
+            self._map,
+            HEADER.size + 4 * self.capacity + 4 * self.count,
+            value,
+        )
+        self.count += 1
+        # the count is written last so a crash never exposes a partial sample
+        struct.pack_into("<I", self._map, 4, self.count)
+
+    def _grow(self) -> None:
+        """Double the capacity, moving the value column behind the new time column."""
+        times, values = self.columns()
+        self.close()
+        capacity = self.capacity * 2
+        with open(self.path, "r+b") as file:
+            file.truncate(HEADER.size + 8 * capacity)
+            file.seek(0)
+            file.write(HEADER.pack(MAGIC, self.count, capacity))
+            file.write(times.tobytes())
+            file.seek(HEADER.size + 4 * capacity)
+            file.write(values.tobytes())
+        self._open()
+
+    def columns(self) -> tuple[array, array]:
+        """Return the time and value columns."""
+        return read_columns(self._map)
+
+    def flush(self) -> None:
+        """Write the mapped pages to disk."""
+        self._map.flush()
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        self._map.close()
+        self._file.close()
+
+
+def read_columns(buffer) -> tuple[array, array]:
+    """Return the time and value columns of a segment held in `buffer`."""
+    _magic, count, capacity = HEADER.unpack_from(buffer)
+    times = array("I")
+    values = array("f")
+    times.frombytes(buffer[HEADER.size : HEADER.size + 4 * count])
+    start = HEADER.size + 4 * capacity
+    values.frombytes(buffer[start : start + 4 * count])
+    return times, values
+
+
+def bucket_means(samples, bucket_seconds: int) -> list[tuple[int, float]]:
+    """Return the mean of (timestamp, value) samples per bucket, in time order."""
+    buckets: dict[int, list[float]] = {}
+    for timestamp, value in samples:
+        bucket = buckets.setdefault(timestamp - timestamp % bucket_seconds, [0, 0])
+        bucket[0] += value
+        bucket[1] += 1
+    return [
+        (timestamp, total / count)
+        for timestamp, (total, count) in sorted(buckets.items())
+    ]
+
+
+class TimeSeriesStore:
+    """Series of device readings kept in segment files under `directory`.
+
+    Series are named "<idx>.<field>". All methods are blocking and thread
+    safe; call them from the executor.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Initialize a TimeSeriesStore."""
+        self.directory = directory
+        self.appended = 0
+        self._segments: dict[tuple[str, str], tuple[str, Segment]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, tier: str, series: str, day: str) -> str:
+        return os.path.join(self.directory, tier, series, day + ".seg")
+
+    def append(self, samples) -> None:
+        """Append (series, timestamp, value) samples to the raw tier."""
+        with self._lock:
+            for series, timestamp, value in samples:
+                day = day_of(timestamp)
+                open_day, segment = self._segments.get((RAW, series), (None, None))
+                if open_day != day:
+                    if segment is not None:
+                        segment.close()
+                    segment = Segment(self._path(RAW, series, day), TIERS[RAW][2])
+                    self._segments[(RAW, series)] = (day, segment)
+                segment.append(timestamp, value)
+                self.appended += 1
+
+    def series(self) -> list[str]:
+        """Return the names of all stored series."""
+        names = set()
+        for tier in TIERS:
+            path = os.path.join(self.directory, tier)
+            if os.path.isdir(path):
+                names.update(os.listdir(path))
+        return sorted(names)
+
+    def _days(self, tier: str, series: str) -> list[str]:
+        path = os.path.join(self.directory, tier, series)
+        if not os.path.isdir(path):
+            return []
+        return sorted(name[: -len(".seg")] for name in os.listdir(path))
+
+    def _read_day(self, tier: str, series: str, day: str) -> tuple[array, array]:
+        open_day, segment = self._segments.get((tier, series), (None, None))
+        if open_day == day:
+            return segment.columns()
+        with open(self._path(tier, series, day), "rb") as file:
+            return read_columns(file.read())
+
+    def read(self, series: str, start: float, end: float, tier: str = RAW):
+        """Return the (timestamp, value) samples of a series in [start, end)."""
+        first, last = day_of(start), day_of(end)
+        samples = []
+        with self._lock:
+            for day in sorted(self._covered_days(tier, series)):
+                if first <= day <= last:
+                    samples.extend(
+                        (timestamp, value)
+                        for timestamp, value in self._day_samples(tier, series, day)
+                        if start <= timestamp < end
+                    )
+        return samples
+
+    def _covered_days(self, tier: str, series: str) -> set[str]:
+        """Return the days of a tier, counting those still only in its sources."""
+        days = set(self._days(tier, series))
+        if tier in DOWNSAMPLED_FROM:
+            days.update(self._covered_days(DOWNSAMPLED_FROM[tier], series))
+        return days
+
+    def _day_samples(self, tier: str, series: str, day: str):
+        """Return one day of a tier, bucketing it from its source if not compacted.
+
+        Today and any day compact() has not reached yet exist only in the finer
+        tiers, so they are downsampled on the fly.
+        """
+        if tier not in DOWNSAMPLED_FROM or os.path.exists(
+            self._path(tier, series, day)
+        ):
+            return zip(*self._read_day(tier, series, day))
+        source = DOWNSAMPLED_FROM[tier]
+        return bucket_means(self._day_samples(source, series, day), TIERS[tier][0])
+
+    def tier_for(self, start: float, now: float | None = None) -> str:
+        """Return the finest tier still holding samples from `start`."""
+        now = time.time() if now is None else now
+        for tier, (_bucket, retention, _capacity) in TIERS.items():
+            if start >= now - retention * 86400:
+                return tier
+        return HOUR
+
+    def compact(self, now: float | None = None) -> None:
+        """Downsample complete days and drop segments past their retention."""
+        now = time.time() if now is None else now
+        today = day_of(now)
+        with self._lock:
+            for (tier, series), (day, segment) in list(self._segments.items()):
+                if day != today:
+                    segment.close()
+                    del self._segments[(tier, series)]
+                else:
+                    segment.flush()
+            for series in self.series():
+                for tier, source in DOWNSAMPLED_FROM.items():
+                    done = set(self._days(tier, series))
+                    for day in self._days(source, series):
+                        if day < today and day not in done:
+                            self._downsample(series, source, tier, day)
+                for tier, (_bucket, retention, _capacity) in TIERS.items():
+                    oldest = day_of(now - retention * 86400)
+                    for day in self._days(tier, series):
+                        if day < oldest:
+                            os.remove(self._path(tier, series, day))
+                for tier in TIERS:
+                    path = os.path.join(self.directory, tier, series)
+                    if os.path.isdir(path) and not os.listdir(path):
+                        os.rmdir(path)
+
+    def _downsample(self, series: str, source: str, tier: str, day: str) -> None:
+        """Write the bucket means of one day of `source` into `tier`."""
+        bucket_seconds, _retention, capacity = TIERS[tier]
+        samples = bucket_means(
+            zip(*self._read_day(source, series, day)), bucket_seconds
+        )
+        segment = Segment(self._path(tier, series, day), capacity)
+        try:
+            for timestamp, value in samples:
+                segment.append(timestamp, value)
+        finally:
+            segment.close()
+
+    def export(
+        self, filename: str, start: float, end: float, tier: str | None = None
+    ) -> int:
+        """Write all series in [start, end) as CSV and return the rows written.
+
+        The finest tier still covering `start` is used unless `tier` is given,
+        with days not compacted yet bucketed from the raw samples; a filename
+        ending in .gz is gzipped.
+        """
+        tier = tier or self.tier_for(start)
+        opener = gzip.open if filename.endswith(".gz") else open
+        rows = 0
+        with opener(filename, "wt", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(["time", "idx", "field", "value"])
+            for series in self.series():
+                idx, field = series.split(".", 1)
+                for timestamp, value in self.read(series, start, end, tier):
+                    writer.writerow(
+                        [
+                            datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+                            idx,
+                            field,
+                            round(value, 2),
+                        ]
+                    )
+                    rows += 1
+        return rows
+
+    def size(self) -> int:
+        """Return the bytes used on disk."""
+        total = 0
+        for root, _dirs, files in os.walk(self.directory):
+            total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        return total
+
+    def close(self) -> None:
+        """Flush and close the open segments."""
+        with self._lock:
+            for _day, segment in self._segments.values():
+                segment.flush()
+                segment.close()
+            self._segments.clear()
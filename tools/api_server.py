@@ -0,0 +1,180 @@
+"""Local stand-in for the xi_home api.
+
+Serves the endpoints the integration uses for a made-up home with the
+given number of rooms. Commands change the served status, and acs
+readings drift on every /device/status request:
+
+    python tools/api_server.py --rooms 4 --port 8766
+
+Point the integration at it by setting helper.API_PREFIX to
+http://127.0.0.1:8766.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import threading
+
+from aiohttp import web
+
+
+def make_devices(rooms: int) -> tuple[list[dict], list[dict]]:
+    """Return the groups and devices of a home with `rooms` rooms."""
+    groups = []
+    devices = []
+
+    def add(group, group_id, device_type, name, status):
+        idx = len(devices) + 1
+        devices.append(
+            {
+                "idx": idx,
+                "device_id": "{}_{}".format(device_type.replace("-", "_"), idx),
+                "groupID": group_id,
+                "group": group,
+                "type": device_type,
+                "name": name,
+                "status": status,
+            }
+        )
+
+    for room in range(1, rooms + 1):
+        group = "Room{}".format(room)
+        groups.append({"name": group, "groupID": room})
+        add(group, room, "light", "Light.1", {"power": False})
+        add(group, room, "dimming", "Dimming.1", {"power": False, "dimming": "0"})
+        add(
+            group,
+            room,
+            "heating-system",
+            "Heating.1",
+            {"power": False, "mode": 0, "curtemp": "21", "settemp": "22"},
+        )
+        add(
+            group,
+            room,
+            "acs",
+            "Acs.1",
+            {
+                "fau_runstate": 0,
+                "erv_runstate": 0,
+                "dust_value": "0",
+                "co2_value": "0",
+                "smell_value": "0",
+                "dust_unit": "PM10",
+            },
+        )
+    add("Home", 0, "lightall", "Lightall.1", {"power": False})
+    add("Home", 0, "public-elevator", "Elevator.1", {})
+    return groups, devices
+
+
+class ApiServer:
+    """Serve a made-up home over the xi_home api."""
+
+    def __init__(self, rooms: int = 4) -> None:
+        """Initialize an ApiServer."""
+        self.groups, self.devices = make_devices(rooms)
+        self.by_id = {device["device_id"]: device for device in self.devices}
+        self.requests = 0
+        self._random = random.Random(0)
+
+    def app(self) -> web.Application:
+        """Return the aiohttp application."""
+        app = web.Application()
+        app.router.add_post("/{path:.*}", self.http)
+        return app
+
+    async def http(self, request: web.Request) -> web.Response:
+        """Answer an api request over HTTP."""
+        body = await request.json()
+        return web.json_response(self.answer(request.path, body))
+
+    def answer(self, path: str, body: dict) -> dict:
+        """Return the response to an api request."""
+        self.requests += 1
+        if path == "/auth/user":
+            return {"result": 0, "sessionid": "stand-in-session"}
+        if path == "/public" and body.get("type") == "doorlock":
+            return {
+                "data": {
+                    "list": [
+                        {"lobbyHo": "1", "lobbydong": "101", "comment": "Lobby 1"}
+                    ]
+                }
+            }
+        if path == "/device/list-redis":
+            return {"groups": self.groups, "devices": self.devices}
+        if path == "/device/status":
+            return {"status": self.status(body["device_id"])}
+        if path == "/device/command":
+            self.command(body["device_id"], body["status"])
+        return {"result": "ok"}
+
+    def status(self, device_id: str) -> dict:
+        """Return the status of one device, with drifting air quality."""
+        device = self.by_id[device_id]
+        status = device["status"]
+        if device["type"] == "acs":
+            status["dust_value"] = str(self._random.randint(5, 80))
+            status["co2_value"] = str(self._random.randint(400, 1500))
+            status["smell_value"] = str(self._random.randint(0, 5))
+        return status
+
+    def command(self, device_id: str, status: dict) -> None:
+        """Apply a command to the served status."""
+        device = self.by_id[device_id]
+        for key, value in status.items():
+            # list-redis names the air volume without the underscore
+            device["status"][key.replace("air_volume", "airvolume")] = value
+
+
+class ServerThread(threading.Thread):
+    """Run an aiohttp application on its own event loop in the background."""
+
+    def __init__(self, app: web.Application, host: str, port: int) -> None:
+        """Initialize a ServerThread."""
+        super().__init__(daemon=True)
+        self._app = app
+        self._host = host
+        self._port = port
+        self._loop = asyncio.new_event_loop()
+        self._runner = web.AppRunner(app)
+        self._started = threading.Event()
+
+    def run(self) -> None:
+        """Serve until stopped."""
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._runner.setup())
+        site = web.TCPSite(self._runner, self._host, self._port)
+        self._loop.run_until_complete(site.start())
+        self._started.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+    def start(self) -> None:
+        """Start serving and wait until the server listens."""
+        super().start()
+        self._started.wait()
+
+    def stop(self) -> None:
+        """Stop serving."""
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self.join()
+
+
+def main() -> None:
+    """Run the server."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--rooms", type=int, default=4)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    web.run_app(ApiServer(args.rooms).app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark of the state writes of the xi_home entities.
+
+Creates the entities of a made-up home served by the local api stand-in
+and times `async_write_ha_state` on each of them, which is where Home
+Assistant reads every state and capability attribute of an entity:
+
+    python tools/bench_entities.py --rooms 50 --rounds 200
+
+Prints the CPU time per write for each entity class. Run it on two
+revisions to compare them. Needs Home Assistant, like tools/soak.py.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import collections
+import tempfile
+import time
+
+from api_server import ApiServer, ServerThread
+from soak import integration_module, make_entities
+
+
+async def bench(args) -> None:
+    """Run the benchmark and print the results."""
+    from homeassistant.core import HomeAssistant
+
+    integration = integration_module("")
+    helper = integration_module(".helper")
+    const = integration_module(".const")
+
+    server = ApiServer(args.rooms)
+    thread = ServerThread(server.app(), "127.0.0.1", args.port)
+    thread.start()
+    helper.API_PREFIX = "http://127.0.0.1:{}".format(args.port)
+
+    hass = HomeAssistant(tempfile.mkdtemp())
+    coordinator = integration.MyCoordinator(
+        hass, "bench-token", "bench-user", options={const.CONF_RETRY: 0}
+    )
+    await coordinator.metadata.async_refresh()
+    coordinator.async_metadata_updated()
+    await coordinator.async_refresh()
+    await coordinator.air_quality.async_refresh()
+    entities = make_entities(hass, coordinator)
+
+    by_class = collections.defaultdict(list)
+    for entity in entities:
+        by_class[type(entity).__name__].append(entity)
+
+    total_time = 0.0
+    total_writes = 0
+    for name, group in sorted(by_class.items()):
+        # one untimed round fills the caches of Home Assistant
+        for entity in group:
+            entity.async_write_ha_state()
+        start = time.process_time()
+        for _round in range(args.rounds):
+            for entity in group:
+                entity.async_write_ha_state()
+        elapsed = time.process_time() - start
+        writes = args.rounds * len(group)
+        total_time += elapsed
+        total_writes += writes
+        print(
+            "{:28} {:>5} entities {:>8.1f} µs/write".format(
+                name, len(group), elapsed / writes * 1e6
+            )
+        )
+    print(
+        "{:28} {:>5} entities {:>8.1f} µs/write".format(
+            "all", len(entities), total_time / total_writes * 1e6
+        )
+    )
+
+    await hass.async_add_executor_job(helper.close_sessions)
+    await hass.async_stop(force=True)
+    thread.stop()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rooms", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
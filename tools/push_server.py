@@ -0,0 +1,100 @@
+"""Local stand-in for the xi_home push channel.
+
+Serves a websocket at /ws that the integration can use as its push url,
+e.g. ws://127.0.0.1:8765/ws. Anything POSTed as JSON to /push is
+broadcast to every connected client, and --toggle makes the server flip
+the power of the given device idx values on its own:
+
+    python tools/push_server.py --toggle 12,13 --interval 5
+    curl -X POST localhost:8765/push -d '{"idx": 12, "status": {"power": true}}'
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+
+from aiohttp import WSMsgType, web
+
+_LOGGER = logging.getLogger("push_server")
+
+
+class PushServer:
+    """Broadcast status patches to websocket clients."""
+
+    def __init__(self) -> None:
+        """Initialize a PushServer."""
+        self.clients: set[web.WebSocketResponse] = set()
+
+    async def websocket(self, request: web.Request) -> web.WebSocketResponse:
+        """Accept a client and keep it until it disconnects."""
+        websocket = web.WebSocketResponse(heartbeat=30)
+        await websocket.prepare(request)
+        self.clients.add(websocket)
+        _LOGGER.info("Client connected (%d total)", len(self.clients))
+        try:
+            async for message in websocket:
+                if message.type == WSMsgType.TEXT:
+                    _LOGGER.info("Client says %s", message.data)
+        finally:
+            self.clients.discard(websocket)
+            _LOGGER.info("Client disconnected (%d left)", len(self.clients))
+        return websocket
+
+    async def push(self, request: web.Request) -> web.Response:
+        """Broadcast the posted JSON body."""
+        await self.broadcast(await request.json())
+        return web.json_response({"clients": len(self.clients)})
+
+    async def broadcast(self, message) -> None:
+        """Send `message` to every client."""
+        data = json.dumps(message)
+        for websocket in list(self.clients):
+            await websocket.send_str(data)
+
+    async def toggle(self, idx_values: list[int], interval: float) -> None:
+        """Flip the power of the given devices every `interval` seconds."""
+        power = False
+        while True:
+            await asyncio.sleep(interval)
+            power = not power
+            await self.broadcast(
+                {
+                    "devices": [
+                        {"idx": idx, "status": {"power": power}} for idx in idx_values
+                    ]
+                }
+            )
+
+
+def main() -> None:
+    """Run the server."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--toggle", default="", help="comma separated idx values")
+    parser.add_argument("--interval", type=float, default=10)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    server = PushServer()
+    app = web.Application()
+    app.router.add_get("/ws", server.websocket)
+    app.router.add_post("/push", server.push)
+
+    if args.toggle:
+        idx_values = [int(idx) for idx in args.toggle.split(",")]
+
+        async def start_toggle(app: web.Application) -> None:
+            app["toggle"] = asyncio.create_task(
+                server.toggle(idx_values, args.interval)
+            )
+
+        app.on_startup.append(start_toggle)
+
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Soak test of the xi_home integration against the local api stand-in.
+
+Runs the poll cycles of the three coordinators and the entity command
+paths for a number of simulated days, as fast as the stand-in answers.
+Every simulated hour it samples open file descriptors, sockets, threads,
+RSS and Python object counts, and it fails when one of them grew more
+than its threshold between the end of the warm-up and the end of the run:
+
+    python tools/soak.py --days 3 --command-interval 5
+
+Needs Home Assistant and Linux (/proc), and is run from the repository,
+which is imported as the integration package.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import importlib
+import os
+import random
+import sys
+import tempfile
+import threading
+
+from api_server import ApiServer, ServerThread
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MINUTES_PER_DAY = 24 * 60
+
+# sample -> default allowed growth after the warm-up
+THRESHOLDS = {
+    "fds": 10,
+    "sockets": 10,
+    "threads": 5,
+    "rss_kb": 20 * 1024,
+    "objects": 20000,
+}
+
+
+def integration_module(name: str):
+    """Import a module of the integration from this repository."""
+    sys.path.insert(0, os.path.dirname(ROOT))
+    package = os.path.basename(ROOT)
+    return importlib.import_module(package + name)
+
+
+def sample() -> dict[str, int]:
+    """Return the current resource usage of this process."""
+    gc.collect()
+    fds = os.listdir("/proc/self/fd")
+    sockets = 0
+    for fd in fds:
+        try:
+            sockets += os.readlink("/proc/self/fd/" + fd).startswith("socket:")
+        except OSError:
+            # the fd listing itself, closed by now
+            pass
+    with open("/proc/self/statm", encoding="ascii") as statm:
+        rss_pages = int(statm.read().split()[1])
+    return {
+        "fds": len(fds),
+        "sockets": sockets,
+        "threads": threading.active_count(),
+        "rss_kb": rss_pages * os.sysconf("SC_PAGE_SIZE") // 1024,
+        "objects": len(gc.get_objects()),
+    }
+
+
+def make_entities(hass, coordinator) -> list:
+    """Create the entities whose commands the soak sends, listening as in HA."""
+    light = integration_module(".light")
+    climate = integration_module(".climate")
+    fan = integration_module(".fan")
+    switch = integration_module(".switch")
+    button = integration_module(".button")
+    entities = []
+    for device in coordinator.data["devices"]:
+        if device["type"] in ("light", "dimming"):
+            entities.append(light.XiHomeLight(device, coordinator))
+        elif device["type"] == "heating-system":
+            entities.append(climate.XiHomeHeatingSystem(device, coordinator))
+        elif device["type"] == "acs":
+            entities.append(fan.XiHomeVentilationSystem(device, coordinator))
+            entities.append(fan.XiHomeFreshAirUnit(device, coordinator))
+        elif device["type"] == "lightall":
+            entities.append(switch.XiHomeAllLightSwtich(device, coordinator))
+        elif device["type"] == "public-elevator":
+            entities.append(button.XiHomeElevatorButton(device, coordinator))
+    for door in coordinator.lobby_door_data:
+        entities.append(button.XiHomeDoorButton(door, coordinator))
+    for entity in entities:
+        entity.hass = hass
+        if hasattr(entity, "coordinator_context"):
+            entity.coordinator.async_add_listener(
+                entity._handle_coordinator_update, entity.coordinator_context
+            )
+    return entities
+
+
+def command(entity, rng: random.Random) -> None:
+    """Send one random command through an entity, as a service call would."""
+    if hasattr(entity, "press"):
+        entity.press()
+    elif hasattr(entity, "set_temperature"):
+        entity.set_temperature(temperature=rng.randint(18, 26))
+    elif rng.random() < 0.5:
+        entity.turn_on()
+    else:
+        entity.turn_off()
+
+
+async def soak(args) -> int:
+    """Run the soak and return the process exit code."""
+    from homeassistant.core import HomeAssistant
+
+    integration = integration_module("")
+    helper = integration_module(".helper")
+    const = integration_module(".const")
+
+    server = ApiServer(args.rooms)
+    thread = ServerThread(server.app(), "127.0.0.1", args.port)
+    thread.start()
+    helper.API_PREFIX = "http://127.0.0.1:{}".format(args.port)
+
+    hass = HomeAssistant(tempfile.mkdtemp())
+    coordinator = integration.MyCoordinator(
+        hass, "soak-token", "soak-user", options={const.CONF_RETRY: 0}
+    )
+    await coordinator.metadata.async_refresh()
+    coordinator.async_metadata_updated()
+    await coordinator.async_refresh()
+    await coordinator.air_quality.async_refresh()
+    entities = make_entities(hass, coordinator)
+
+    rng = random.Random(0)
+    air_quality_every = max(
+        coordinator.options[const.CONF_AIR_QUALITY_INTERVAL] // 60, 1
+    )
+    metadata_every = 12 * 60
+    baseline = None
+    failures = []
+    for minute in range(1, args.days * MINUTES_PER_DAY + 1):
+        await coordinator.async_refresh()
+        if minute % air_quality_every == 0:
+            await coordinator.air_quality.async_refresh()
+        if minute % metadata_every == 0:
+            await coordinator.metadata.async_refresh()
+        if minute % args.command_interval == 0:
+            entity = rng.choice(entities)
+            await hass.async_add_executor_job(command, entity, rng)
+        if not coordinator.last_update_success:
+            failures.append("poll failed at minute {}".format(minute))
+            break
+        if minute % 60:
+            continue
+
+        current = sample()
+        print(
+            "day {:>3} {:02}:00  ".format(minute // MINUTES_PER_DAY, minute // 60 % 24)
+            + "  ".join("{} {}".format(key, value) for key, value in current.items()),
+            flush=True,
+        )
+        if minute == args.warmup * 60:
+            baseline = current
+
+    await hass.async_add_executor_job(helper.close_sessions)
+    await hass.async_stop(force=True)
+    thread.stop()
+
+    if baseline is None:
+        failures.append("run ended before the warm-up")
+    else:
+        for key in THRESHOLDS:
+            allowed = getattr(args, "max_" + key)
+            growth = current[key] - baseline[key]
+            print(
+                "{:8} {:>10} -> {:>10} ({:+})".format(
+                    key, baseline[key], current[key], growth
+                )
+            )
+            if growth > allowed:
+                failures.append(
+                    "{} grew by {} (allowed {})".format(key, growth, allowed)
+                )
+    print("{} api requests".format(server.requests))
+    for failure in failures:
+        print("FAIL: " + failure)
+    return 1 if failures else 0
+
+
+def main() -> None:
+    """Run the soak."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=1, help="simulated days")
+    parser.add_argument("--warmup", type=int, default=3, help="simulated hours")
+    parser.add_argument("--rooms", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument(
+        "--command-interval", type=int, default=10, help="simulated minutes"
+    )
+    for key, threshold in THRESHOLDS.items():
+        parser.add_argument(
+            "--max-" + key.replace("_", "-"), type=int, default=threshold
+        )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(soak(args)))
+
+
+if __name__ == "__main__":
+    main()
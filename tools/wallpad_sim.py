@@ -0,0 +1,79 @@
+"""Local simulator of the wallpad (home gateway) of an apartment.
+
+Speaks the newline-delimited JSON protocol of transport.LocalTransport
+for the made-up home of api_server.py, with an optional delay standing
+in for the LAN round trip:
+
+    python tools/wallpad_sim.py --rooms 4 --port 9500 --latency 0.005
+
+Set the wallpad address option of the integration to 127.0.0.1:9500.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+
+from api_server import ApiServer
+
+_LOGGER = logging.getLogger("wallpad_sim")
+
+# paths a wallpad answers; the rest belong to the cloud
+LOCAL_PATHS = {"/device/list-redis", "/device/status", "/device/command"}
+
+
+class WallpadSimulator:
+    """Answer wallpad requests from the stand-in api's device model."""
+
+    def __init__(self, server: ApiServer, latency: float = 0) -> None:
+        """Initialize a WallpadSimulator."""
+        self.server = server
+        self.latency = latency
+
+    async def client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer the requests of one connection until it closes."""
+        _LOGGER.info("Client connected from %s", writer.get_extra_info("peername"))
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                message = {"id": request["id"]}
+                if request["path"] in LOCAL_PATHS:
+                    message["response"] = self.server.answer(
+                        request["path"], request["body"]
+                    )
+                else:
+                    message["error"] = "unsupported path " + request["path"]
+                writer.write(json.dumps(message).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+            _LOGGER.info("Client disconnected")
+
+
+async def serve(args) -> None:
+    """Run the simulator until interrupted."""
+    simulator = WallpadSimulator(ApiServer(args.rooms), args.latency)
+    server = await asyncio.start_server(simulator.client, args.host, args.port)
+    async with server:
+        await server.serve_forever()
+
+
+def main() -> None:
+    """Run the simulator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9500)
+    parser.add_argument("--rooms", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0, help="seconds")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(serve(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Bulk operations over many xi_home accounts with the standalone client.
+
+Accounts are read from a JSON file, a list of {"username": ..., "token": ...}.
+All accounts are handled concurrently, with at most --concurrency requests
+in flight in total:
+
+    python tools/xi_client.py --accounts accounts.json status > status.json
+    python tools/xi_client.py --accounts accounts.json status --air-quality
+    python tools/xi_client.py --accounts accounts.json command \\
+        --type light --status '{"power": false}'
+
+The request count and elapsed time go to stderr. Needs aiohttp but not
+Home Assistant; --api-prefix http://127.0.0.1:8766 uses tools/api_server.py.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import sys
+import time
+import types
+
+import aiohttp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def client_module():
+    """Import client.py without running the integration's package init."""
+    package = os.path.basename(ROOT)
+    if package not in sys.modules:
+        module = types.ModuleType(package)
+        module.__path__ = [ROOT]
+        sys.modules[package] = module
+    return importlib.import_module(package + ".client")
+
+
+async def status(client, args) -> dict:
+    """Return the devices of an account, with acs air quality if asked."""
+    devices = await client.devices()
+    if args.air_quality:
+        acs = [device for device in devices["devices"] if device["type"] == "acs"]
+        readings = await asyncio.gather(
+            *(
+                client.device_status(device["device_id"], device["groupID"])
+                for device in acs
+            )
+        )
+        for device, reading in zip(acs, readings):
+            device["air_quality"] = reading
+    return devices
+
+
+async def command(client, args) -> dict:
+    """Send the command to the matching devices of an account."""
+    devices = await client.devices()
+    targets = [
+        device
+        for device in devices["devices"]
+        if device["type"] == args.type and args.group in (None, device["group"])
+    ]
+    results = await asyncio.gather(
+        *(
+            client.command(
+                device["device_id"], device["groupID"], device["type"], args.status
+            )
+            for device in targets
+        ),
+        return_exceptions=True,
+    )
+    failed = [
+        "{}: {}".format(device["device_id"], result)
+        for device, result in zip(targets, results)
+        if isinstance(result, Exception)
+    ]
+    return {"sent": len(targets) - len(failed), "failed": failed}
+
+
+async def run(args) -> int:
+    """Run the operation for every account and print the results."""
+    module = client_module()
+    with open(args.accounts, encoding="utf-8") as file:
+        accounts = json.load(file)
+    operation = status if args.operation == "status" else command
+
+    limiter = asyncio.Semaphore(args.concurrency)
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    start = time.monotonic()
+    async with aiohttp.ClientSession(connector=connector) as session:
+        clients = [
+            module.XiHomeClient(
+                account["token"],
+                account["username"],
+                session=session,
+                limiter=limiter,
+                api_prefix=args.api_prefix,
+                timeout=args.timeout,
+                retry=args.retry,
+            )
+            for account in accounts
+        ]
+        results = await asyncio.gather(
+            *(operation(account_client, args) for account_client in clients),
+            return_exceptions=True,
+        )
+    elapsed = time.monotonic() - start
+
+    output = {}
+    errors = 0
+    for account, result in zip(accounts, results):
+        if isinstance(result, Exception):
+            errors += 1
+            result = {"error": "{}: {}".format(type(result).__name__, result)}
+        output[account["username"]] = result
+    json.dump(output, sys.stdout, indent=2, ensure_ascii=False)
+    print()
+    print(
+        "{} accounts, {} failed, {} requests in {:.2f}s".format(
+            len(accounts),
+            errors,
+            sum(account_client.requests for account_client in clients),
+            elapsed,
+        ),
+        file=sys.stderr,
+    )
+    return 1 if errors else 0
+
+
+def main() -> None:
+    """Run the command line interface."""
+    module = client_module()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", required=True, help="JSON file of accounts")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--api-prefix", default=module.API_PREFIX)
+    parser.add_argument("--timeout", type=float, default=module.TIMEOUT)
+    parser.add_argument("--retry", type=int, default=0)
+    operations = parser.add_subparsers(dest="operation", required=True)
+    status_parser = operations.add_parser("status", help="dump the device status")
+    status_parser.add_argument(
+        "--air-quality", action="store_true", help="also fetch acs air quality"
+    )
+    command_parser = operations.add_parser("command", help="command many devices")
+    command_parser.add_argument("--type", required=True, help="device type")
+    command_parser.add_argument("--group", help="only devices in this room")
+    command_parser.add_argument(
+        "--status", required=True, type=json.loads, help="status fields, as JSON"
+    )
+    args = parser.parse_args()
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
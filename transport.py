@@ -0,0 +1,162 @@
+"""Transports carrying xi_home api requests.
+
+The cloud transport is the HTTPS api used by the Xi Space app. The
+experimental local transport talks to the wallpad (home gateway) in the
+apartment over one persistent TCP connection. The format below is assumed,
+not yet confirmed from captured wallpad traffic; newline-delimited JSON:
+
+    -> {"id": 7, "path": "/device/status", "body": {...}}
+    <- {"id": 7, "response": {...}}
+    <- {"id": 7, "error": "unknown device"}
+
+Bodies and responses are the same as the cloud api's. The wallpad only
+knows the devices of its own apartment; logins and building services
+(lobby doors, elevator) always go to the cloud.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import json
+import socket
+import threading
+import time
+
+from .const import RETRY, TIMEOUT
+from .helper import request_data
+
+LOCAL_PORT = 9500
+# paths the wallpad answers itself
+LOCAL_PATHS = {"/device/list-redis", "/device/status", "/device/command"}
+# seconds the wallpad is skipped after a connection failure, doubled per failure
+SKIP_MIN = 30
+SKIP_MAX = 900
+
+
+class Transport(ABC):
+    """Carries requests to a xi_home backend."""
+
+    name = ""
+
+    def handles(self, path: str) -> bool:
+        """Return whether requests to `path` can be sent over this transport."""
+        return True
+
+    @abstractmethod
+    def request(self, path, body, profiler=None, timeout=TIMEOUT, retry=RETRY):
+        """Send a request and return the decoded response."""
+
+    def close(self) -> None:
+        """Release the connections of this transport."""
+
+
+class CloudTransport(Transport):
+    """The xi_home cloud api, with this account's token.
+
+    Requests go over the HTTP sessions shared by the integration, which
+    are closed with helper.close_sessions() rather than by the transport.
+    """
+
+    name = "cloud"
+
+    def __init__(self, token: str) -> None:
+        """Initialize a CloudTransport."""
+        self.token = token
+
+    def request(self, path, body, profiler=None, timeout=TIMEOUT, retry=RETRY):
+        """Send a request to the cloud api."""
+        return request_data(
+            path, self.token, body, profiler=profiler, timeout=timeout, retry=retry
+        )
+
+
+class LocalTransport(Transport):
+    """The wallpad on the LAN, over one persistent connection.
+
+    Requests are serialised on the connection, which is reopened once
+    when it turns out to be broken. After a connection failure the wallpad
+    is not available for a while, so callers go to the cloud right away.
+    """
+
+    name = "local"
+
+    def __init__(self, host: str) -> None:
+        """Initialize a LocalTransport for "host" or "host:port"."""
+        host, _, port = host.partition(":")
+        self.address = (host, int(port) if port else LOCAL_PORT)
+        self._socket: socket.socket | None = None
+        self._reader = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self._skip = SKIP_MIN
+        self._skip_until = 0.0
+
+    def handles(self, path: str) -> bool:
+        """Return whether the wallpad answers requests to `path`."""
+        return path in LOCAL_PATHS
+
+    def available(self) -> bool:
+        """Return whether the wallpad is not being skipped after a failure."""
+        return time.monotonic() >= self._skip_until
+
+    def request(self, path, body, profiler=None, timeout=TIMEOUT, retry=RETRY):
+        """Send a request to the wallpad."""
+        with self._lock:
+            try:
+                response = self._request_retrying(path, body, profiler, timeout, retry)
+            except OSError:
+                self._skip_until = time.monotonic() + self._skip
+                self._skip = min(self._skip * 2, SKIP_MAX)
+                raise
+            self._skip = SKIP_MIN
+            return response
+
+    def _request_retrying(self, path, body, profiler, timeout, retry):
+        try:
+            return self._request(path, body, profiler, timeout)
+        except OSError:
+            self._disconnect()
+            if not retry:
+                raise
+        return self._request(path, body, profiler, timeout)
+
+    def _request(self, path, body, profiler, timeout):
+        if self._socket is None:
+            self._socket = socket.create_connection(self.address, timeout=timeout)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._reader = self._socket.makefile("rb")
+        self._socket.settimeout(timeout)
+        self._next_id += 1
+        line = json.dumps({"id": self._next_id, "path": path, "body": body})
+        if profiler is None:
+            message = self._exchange(line)
+        else:
+            with profiler.span("local " + path):
+                message = self._exchange(line)
+        if message.get("id") != self._next_id:
+            raise ConnectionError("Out of order wallpad response")
+        if "error" in message:
+            raise ValueError("Wallpad error: {}".format(message["error"]))
+        return message["response"]
+
+    def _exchange(self, line: str) -> dict:
+        """Write one request line and read the response line."""
+        self._socket.sendall(line.encode() + b"\n")
+        response = self._reader.readline()
+        if not response:
+            raise ConnectionError("Wallpad closed the connection")
+        try:
+            return json.loads(response)
+        except ValueError as err:
+            raise ConnectionError("Garbled wallpad response") from err
+
+    def _disconnect(self) -> None:
+        if self._socket is not None:
+            self._reader.close()
+            self._socket.close()
+        self._socket = None
+        self._reader = None
+
+    def close(self) -> None:
+        """Close the connection."""
+        with self._lock:
+            self._disconnect()